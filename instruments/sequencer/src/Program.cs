@@ -1,6 +1,8 @@
 using System;
+using System.Globalization;
 using System.Security.Cryptography;
 using System.Text;
+using System.Text.Json;
 
 namespace Sequencer
 {
@@ -18,7 +20,9 @@ namespace Sequencer
             try
             {
                 if (command == "gen-user") GenUser(args);
+                else if (command == "gen-users") GenUsers();
                 else if (command == "gen-prim") GenPrim(args);
+                else if (command == "gen-prims") GenPrims(args);
                 else
                 {
                     Console.Error.WriteLine($"Unknown command: {command}");
@@ -48,6 +52,33 @@ namespace Sequencer
             string pass = GetArg(args, "--pass");
             string uuid = GetArg(args, "--uuid");
 
+            WriteUserSql(first, last, pass, uuid);
+        }
+
+        // Reads a JSON array of {"First", "Last", "Password", "UUID"} objects
+        // from stdin and emits the SQL for all of them in one run.
+        static void GenUsers()
+        {
+            using JsonDocument cast = JsonDocument.Parse(Console.In.ReadToEnd());
+            foreach (JsonElement actor in cast.RootElement.EnumerateArray())
+            {
+                WriteUserSql(
+                    GetField(actor, "First"),
+                    GetField(actor, "Last"),
+                    GetField(actor, "Password"),
+                    GetField(actor, "UUID"));
+            }
+        }
+
+        static string GetField(JsonElement actor, string name)
+        {
+            if (actor.TryGetProperty(name, out JsonElement value) && value.ValueKind == JsonValueKind.String)
+                return value.GetString();
+            throw new ArgumentException($"Missing field: {name}");
+        }
+
+        static void WriteUserSql(string first, string last, string pass, string uuid)
+        {
             string salt = "12345678901234567890123456789012";
             string md5Pass = ComputeMD5(pass);
             string finalHash = ComputeMD5($"{md5Pass}:{salt}");
@@ -69,7 +100,109 @@ namespace Sequencer
             string posY = GetArg(args, "--posY");
             string posZ = GetArg(args, "--posZ");
 
-            string primUUID = Guid.NewGuid().ToString();
+            WritePrimSql(Guid.NewGuid().ToString(), owner, region, posX, posY, posZ);
+        }
+
+        static string GetArg(string[] args, string name, string fallback)
+        {
+            for (int i = 0; i < args.Length; i++)
+            {
+                if (args[i] == name && i + 1 < args.Length) return args[i + 1];
+            }
+            return fallback;
+        }
+
+        // Lays out --count prims around (--centerX, --centerY) at height --posZ.
+        // UUIDs (and random positions) derive from every layout argument, so the
+        // same arguments always produce the same rows and a re-layout new ones.
+        static void GenPrims(string[] args)
+        {
+            string owner = GetArg(args, "--owner");
+            string region = GetArg(args, "--region");
+            int count = int.Parse(GetArg(args, "--count"));
+            string layout = GetArg(args, "--layout", "grid");
+            int seed = int.Parse(GetArg(args, "--seed", "0"));
+            double centerX = ParseDouble(GetArg(args, "--centerX", "128"));
+            double centerY = ParseDouble(GetArg(args, "--centerY", "128"));
+            double posZ = ParseDouble(GetArg(args, "--posZ", "25"));
+            double spacing = ParseDouble(GetArg(args, "--spacing", "2"));
+
+            const double RegionSize = 256;
+            const double Margin = 0.5;
+            if (count < 1) throw new ArgumentException("--count must be at least 1");
+            if (spacing <= 0) throw new ArgumentException("--spacing must be positive");
+
+            Random random = new Random(seed);
+            int perRow = Math.Max(1, Math.Min((int)Math.Ceiling(Math.Sqrt(count)), (int)(RegionSize / spacing)));
+            double goldenAngle = Math.PI * (3 - Math.Sqrt(5));
+
+            // Half the width of the footprint around the center
+            double extent;
+            if (layout == "grid") extent = (perRow - 1) / 2.0 * spacing;
+            else if (layout == "spiral") extent = spacing * Math.Sqrt(count - 1);
+            else if (layout == "random") extent = Math.Ceiling(Math.Sqrt(count)) * spacing / 2;
+            else throw new ArgumentException($"Unknown layout: {layout}");
+
+            if (centerX - extent < Margin || centerX + extent > RegionSize - Margin ||
+                centerY - extent < Margin || centerY + extent > RegionSize - Margin)
+            {
+                throw new ArgumentException(
+                    $"{count} prims at spacing {FormatDouble(spacing)} ({layout}) span {FormatDouble(2 * extent)}m " +
+                    $"around ({FormatDouble(centerX)}, {FormatDouble(centerY)}) and overflow the {RegionSize}m region; " +
+                    "reduce --count or --spacing, or move the center");
+            }
+
+            string name = $"{region}:{layout}:{seed}:{count}:{FormatDouble(centerX)}:{FormatDouble(centerY)}:{FormatDouble(posZ)}:{FormatDouble(spacing)}";
+            for (int i = 0; i < count; i++)
+            {
+                double x, y, z = posZ;
+                if (layout == "grid")
+                {
+                    // Rows beyond what fits in the region stack upwards in layers
+                    int layer = i / (perRow * perRow);
+                    int cell = i % (perRow * perRow);
+                    x = centerX + (cell % perRow - (perRow - 1) / 2.0) * spacing;
+                    y = centerY + (cell / perRow - (perRow - 1) / 2.0) * spacing;
+                    z = posZ + layer * spacing;
+                }
+                else if (layout == "spiral")
+                {
+                    // Vogel spiral: roughly `spacing` between neighbours
+                    double radius = spacing * Math.Sqrt(i);
+                    x = centerX + radius * Math.Cos(i * goldenAngle);
+                    y = centerY + radius * Math.Sin(i * goldenAngle);
+                }
+                else
+                {
+                    // Uniform over the square a grid of the same count would cover
+                    x = centerX + (random.NextDouble() * 2 - 1) * extent;
+                    y = centerY + (random.NextDouble() * 2 - 1) * extent;
+                }
+
+                WritePrimSql(DeterministicUUID($"{name}:{i}"), owner, region,
+                    FormatDouble(x), FormatDouble(y), FormatDouble(z));
+            }
+        }
+
+        static double ParseDouble(string value) => double.Parse(value, CultureInfo.InvariantCulture);
+
+        static string FormatDouble(double value) => value.ToString("0.###", CultureInfo.InvariantCulture);
+
+        // Name-based (version 3, MD5) UUID
+        static string DeterministicUUID(string name)
+        {
+            using (MD5 md5 = MD5.Create())
+            {
+                byte[] hash = md5.ComputeHash(Encoding.UTF8.GetBytes(name));
+                hash[6] = (byte)((hash[6] & 0x0F) | 0x30);
+                hash[8] = (byte)((hash[8] & 0x3F) | 0x80);
+                string hex = BitConverter.ToString(hash).Replace("-", "").ToLower();
+                return $"{hex.Substring(0, 8)}-{hex.Substring(8, 4)}-{hex.Substring(12, 4)}-{hex.Substring(16, 4)}-{hex.Substring(20, 12)}";
+            }
+        }
+
+        static void WritePrimSql(string primUUID, string owner, string region, string posX, string posY, string posZ)
+        {
             long created = DateTimeOffset.UtcNow.ToUnixTimeSeconds();
             string textureHex = "8955674724CB43ED920B47CAED15465F0000000000000000803F000000803F0000000000000000000000000000000000000000000000000000000000000000";
 
@@ -9,6 +9,21 @@ import signal
 import threading
 import sqlite3
 import uuid
+import ast
+import builtins
+import functools
+import bisect
+import collections
+import glob
+import hashlib
+import shutil
+import concurrent.futures
+import itertools
+import queue
+import struct
+import ctypes
+import ctypes.util
+import mmap
 
 #### WINDOWS MINGW GIT+BASH HELPERS ####
 import platform
@@ -37,7 +52,8 @@ ENSURE_DOTNET = os.path.join(REPO_ROOT, "instruments", "substrate", "ensure_dotn
 MIMIC_SCRIPT = os.path.join(REPO_ROOT, "instruments", "mimic", "run_visitant.sh")
 BENTHIC_SCRIPT = os.path.join(REPO_ROOT, "species", "benthic", "0.1.0", "run_visitant.sh")
 HIPPOLYZER_CLIENT_SCRIPT = os.path.join(REPO_ROOT, "species", "hippolyzer-client", "0.17.0", "run_visitant.sh")
-REST_CONSOLE_WRAPPER = os.path.join(REPO_ROOT, "species", "opensim-core", "rest-console", "connect_opensim_console_session.sh")
+REST_CONSOLE_DIR = os.path.join(REPO_ROOT, "species", "opensim-core", "rest-console")
+REST_CONSOLE_WRAPPER = os.path.join(REST_CONSOLE_DIR, "connect_opensim_console_session.sh")
 
 # Simulant Configuration Map
 if "SIMULANT_FQN" not in os.environ:
@@ -49,20 +65,71 @@ SIMULANT_FQN = os.environ["SIMULANT_FQN"].strip()
 import json
 
 MANIFEST_PATH = os.path.join(REPO_ROOT, "species", "manifest.json")
-try:
-    with open(MANIFEST_PATH, "r") as f:
-        manifest_data = json.load(f)
-except Exception as e:
-    print(f"[DIRECTOR] Error reading manifest.json: {e}")
-    sys.exit(1)
+OBSERVATORY_ENV = os.path.join(REPO_ROOT, "instruments", "substrate", "observatory_env.bash")
+
+# Resolved substrate facts (dotnet root, manifest lookups) are cached on disk,
+# keyed by the mtimes of the files they were derived from.
+SUBSTRATE_CACHE = os.path.join(VIVARIUM_DIR, "substrate", "director_env.json")
+USE_SUBSTRATE_CACHE = os.getenv("DIRECTOR_SUBSTRATE_CACHE", "1") != "0"
+
+def file_fingerprint(paths):
+    fingerprint = {}
+    for path in paths:
+        try:
+            fingerprint[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            fingerprint[path] = None
+    return fingerprint
+
+def load_substrate_cache():
+    if not USE_SUBSTRATE_CACHE:
+        return {}
+    try:
+        with open(SUBSTRATE_CACHE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-SIMULANT_CFG = None
-for entry in manifest_data.get("registry", []):
-    fqn = f"{entry['genus']}-{entry['species']}"
-    if fqn == SIMULANT_FQN:
-        SIMULANT_CFG = {
-            "bin_dir": os.path.join(VIVARIUM_DIR, SIMULANT_FQN, entry.get("bin_dir", "bin")).replace('\\', '/'),
-            "observatory_dir": os.path.join(VIVARIUM_DIR, SIMULANT_FQN, "observatory").replace('\\', '/'),
+def save_substrate_cache(section, value):
+    if not USE_SUBSTRATE_CACHE:
+        return
+    cache = load_substrate_cache()
+    cache[section] = value
+    try:
+        os.makedirs(os.path.dirname(SUBSTRATE_CACHE), exist_ok=True)
+        tmp_path = f"{SUBSTRATE_CACHE}.{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, SUBSTRATE_CACHE)
+    except OSError:
+        pass
+
+def cached_entry(section):
+    """Returns a cache section if the files it was derived from are unchanged."""
+    entry = load_substrate_cache().get(section)
+    if entry and file_fingerprint(entry.get("fingerprint", {})) == entry["fingerprint"]:
+        return entry
+    return None
+
+def lookup_simulant(fqn):
+    """Resolves a simulant's configuration from manifest.json (cached)."""
+    entry = cached_entry("manifest")
+    if entry and fqn in entry["simulants"]:
+        return entry["simulants"][fqn]
+
+    try:
+        with open(MANIFEST_PATH, "r") as f:
+            manifest_data = json.load(f)
+    except Exception as e:
+        print(f"[DIRECTOR] Error reading manifest.json: {e}")
+        sys.exit(1)
+
+    simulants = {}
+    for entry in manifest_data.get("registry", []):
+        entry_fqn = f"{entry['genus']}-{entry['species']}"
+        simulants[entry_fqn] = {
+            "bin_dir": os.path.join(VIVARIUM_DIR, entry_fqn, entry.get("bin_dir", "bin")).replace('\\', '/'),
+            "observatory_dir": os.path.join(VIVARIUM_DIR, entry_fqn, "observatory").replace('\\', '/'),
             "inifile": (
                 entry["inifile"] if os.path.isabs(entry.get("inifile", "")) 
                 else os.path.join(REPO_ROOT, entry.get("inifile", os.path.join("species", entry['genus'], "standalone-observatory-sandbox.ini")))
@@ -70,7 +137,10 @@ for entry in manifest_data.get("registry", []):
             "exe": entry.get("executable", "OpenSim.dll"),
             "tag_ua": f"species/{entry['genus']}/{entry['species']}"
         }
-        break
+    save_substrate_cache("manifest", {"fingerprint": file_fingerprint([MANIFEST_PATH]), "simulants": simulants})
+    return simulants.get(fqn)
+
+SIMULANT_CFG = lookup_simulant(SIMULANT_FQN)
 
 if not SIMULANT_CFG:
     print(f"[DIRECTOR] Error: Unknown Simulant '{SIMULANT_FQN}' not found in manifest.json.")
@@ -86,6 +156,7 @@ OPENSIM_BIN = os.path.join(OPENSIM_DIR, SIMULANT_CFG["exe"])
 evidence_log = []
 SCENARIO_NAME = "unknown"
 SCENARIO_METADATA = {} # Parsed from Frontmatter
+SCENARIO_TEXT = "" # Scenario with includes resolved
 ACTORS = {}
 next_benthic_port = 12000
 SIGINT_COUNT = 0
@@ -115,96 +186,392 @@ class DirectorError(Exception):
 
 # --- Query Engine ---
 
-class AttrDict(dict):
+class RecordView:
     """
-    Dictionary subclass that allows access to keys as attributes.
-    Nested dictionaries are also converted to AttrDicts.
+    Read-only attribute view over a decoded record, without copying it.
+    Nested dictionaries are wrapped lazily on access; missing keys return None
+    to allow safe filtering (e.g. entry.data.user).
     """
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        object.__setattr__(self, "_data", data)
+
     def __getattr__(self, item):
-        try:
-            value = self[item]
-            if isinstance(value, dict):
-                return AttrDict(value)
-            return value
-        except KeyError:
-            # Return None for missing keys to allow safe filtering
-            return None
+        if item.startswith("__"):
+            raise AttributeError(item)
+        value = self._data.get(item)
+        if isinstance(value, dict):
+            return RecordView(value)
+        return value
+
+    def __setattr__(self, item, value):
+        raise AttributeError("query records are read-only")
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if isinstance(value, dict):
+            return RecordView(value)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self._data else default
+
+    def keys(self):
+        return self._data.keys()
+
+    def values(self):
+        return [self[key] for key in self._data]
+
+    def items(self):
+        return [(key, self[key]) for key in self._data]
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, RecordView):
+            other = other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"RecordView({self._data!r})"
+
+compile_pattern = functools.lru_cache(maxsize=256)(re.compile)
 
 def matches(text, pattern):
     """Helper for regex matching in queries."""
     if not isinstance(text, str):
         return False
-    return bool(re.search(pattern, text))
+    return bool(compile_pattern(pattern).search(text))
 
-def evaluate_query(query, line):
-    """Evaluates a python expression against a log line."""
-    line = line.strip()
-    if not line:
-        return False
+# Names a Query: expression may reference (see DIRECTOR.md "JSON Query Syntax")
+QUERY_NAMES = frozenset(["line", "entry", "matches", "re", "math"])
+QUERY_CACHE_SIZE = int(os.getenv("DIRECTOR_QUERY_CACHE_SIZE", "256"))
+
+class QueryError(DirectorError):
+    """Raised when a Query: expression cannot be compiled."""
+    pass
+
+class CompiledQuery:
+    """
+    A Query: expression compiled once and evaluated against many log lines.
+    Literals and line regexes the expression requires form a pre-filter that
+    rejects raw lines before any JSON decoding or eval.
+    Runtime evaluation errors are reported on first occurrence only.
+    """
+    __slots__ = ("source", "code", "uses_line", "literals", "regexes", "failures")
+
+    def __init__(self, source, code, uses_line, literals=(), regexes=()):
+        self.source = source
+        self.code = code
+        self.uses_line = uses_line
+        self.literals = literals # substrings every matching raw line contains
+        self.regexes = regexes # compiled patterns every matching raw line satisfies
+        self.failures = 0
+
+    def admits(self, text):
+        """Cheap pre-filter: False means the query cannot match this raw line."""
+        for literal in self.literals:
+            if literal not in text:
+                return False
+        for regex in self.regexes:
+            if not regex.search(text):
+                return False
+        return True
 
+    def __repr__(self):
+        return f"CompiledQuery({self.source!r})"
+
+    def report_failure(self, error, line):
+        self.failures += 1
+        if self.failures > 1:
+            return
+        # We truncate line content if it's too long
+        trunc_line = (line[:75] + '..') if len(line) > 75 else line
+        print(f"[DIRECTOR] ERROR: Query Evaluation Failed: {error}")
+        print(f"  Query: {self.source}")
+        print(f"  Line: {trunc_line}")
+        print(f"  (further evaluation errors for this query are suppressed)")
+
+def _unknown_query_names(tree):
+    """Returns names loaded by the expression that nothing will provide at eval time."""
+    loaded = set()
+    bound = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Load):
+                loaded.add(node.id)
+            else:
+                bound.add(node.id) # comprehension targets, walrus
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg) # lambda parameters
+    return sorted(loaded - bound - QUERY_NAMES - set(dir(builtins)))
+
+def _is_entry_path(node):
+    """True for attribute chains rooted at entry (entry.sys, entry.data.user, ...)."""
+    while isinstance(node, ast.Attribute):
+        node = node.value
+        if isinstance(node, ast.Name):
+            return node.id == "entry"
+    return False
+
+def _uses_raw_line(tree):
+    """True if the query reads the raw line (line, entry.raw or entry.line), so non-NDJSON lines apply."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id == "line":
+            return True
+        if (isinstance(node, ast.Attribute) and node.attr in ("raw", "line")
+                and isinstance(node.value, ast.Name) and node.value.id == "entry"):
+            return True
+    return False
+
+def _is_str(node):
+    return isinstance(node, ast.Constant) and isinstance(node.value, str) and node.value
+
+# Characters no NDJSON writer we observe escapes (writers differ on '/', '<', '&', '+', non-ASCII...)
+VERBATIM_JSON_LITERAL = re.compile(r'^[A-Za-z0-9 _.,:;!?()#@%=*|~^$\[\]{}-]+$')
+
+def _query_prefilter(tree, uses_line):
+    """
+    Extracts the raw-line requirements of a query from its top-level 'and' terms:
+      entry.x == 'lit'         -> the line contains "lit" (JSON-encoded)
+      'lit' in line            -> the line contains lit
+      matches(line, 'regex')   -> the line matches regex
+    Terms under or/not/etc. are not required and are ignored.
+    """
+    terms = []
+    pending = [tree.body]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And):
+            pending.extend(node.values)
+        else:
+            terms.append(node)
+
+    literals = []
+    regexes = []
+    for node in terms:
+        if isinstance(node, ast.Compare) and len(node.ops) == 1:
+            left, right = node.left, node.comparators[0]
+            if isinstance(node.ops[0], ast.Eq):
+                if _is_entry_path(right):
+                    left, right = right, left
+                if _is_entry_path(left) and _is_str(right):
+                    literal = right.value
+                    # Only literals every JSON writer emits verbatim can be matched in the raw text
+                    if VERBATIM_JSON_LITERAL.match(literal):
+                        # Non-NDJSON lines expose entry.raw/entry.line without quotes
+                        literals.append(literal if uses_line else json.dumps(literal))
+            elif isinstance(node.ops[0], ast.In):
+                if _is_str(left) and isinstance(right, ast.Name) and right.id == "line":
+                    literals.append(left.value)
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "matches":
+            if len(node.args) == 2 and not node.keywords:
+                target, pattern = node.args
+                if isinstance(target, ast.Name) and target.id == "line" and _is_str(pattern):
+                    regexes.append(compile_pattern(pattern.value))
+    return tuple(literals), tuple(regexes)
+
+@functools.lru_cache(maxsize=QUERY_CACHE_SIZE)
+def compile_query(source):
+    """
+    Compiles a Query: expression (cached by source text).
+    Raises QueryError for syntax errors and unknown names.
+    """
+    source = source.strip()
+    try:
+        tree = ast.parse(source, mode="eval")
+        code = compile(tree, "<query>", "eval")
+    except SyntaxError as e:
+        print(f"[DIRECTOR] ERROR: Query Syntax Error: {e.msg} (offset {e.offset})")
+        print(f"  Query: {source}")
+        raise QueryError(f"Invalid query syntax: {source}")
+
+    unknown = _unknown_query_names(tree)
+    if unknown:
+        print(f"[DIRECTOR] ERROR: Query references unknown name(s): {', '.join(unknown)}")
+        print(f"  Query: {source}")
+        raise QueryError(f"Unknown name(s) {', '.join(unknown)} in query: {source}")
+
+    uses_line = _uses_raw_line(tree)
+    try:
+        literals, regexes = _query_prefilter(tree, uses_line)
+    except re.error as e:
+        print(f"[DIRECTOR] ERROR: Query Regex Error: {e}")
+        print(f"  Query: {source}")
+        raise QueryError(f"Invalid regex in query: {source}")
+    return CompiledQuery(source, code, uses_line, literals, regexes)
+
+QUERY_GLOBALS = {
+    "matches": matches,
+    "re": re,
+    "math": __import__("math")
+}
+
+def decode_record(text):
+    """Decodes an NDJSON line; returns None for anything that is not a JSON object."""
+    text = text.strip()
+    if not text.startswith('{'):
+        return None
     try:
-        data = json.loads(line)
-        entry = AttrDict(data)
+        data = json.loads(text)
     except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def evaluate_query(query, line):
+    """Evaluates a compiled (or source text) query against a log line (str or LogLine)."""
+    if isinstance(query, str):
+        query = compile_query(query)
+
+    if isinstance(line, LogLine):
+        record_source = line
+        line = line.text.strip()
+    else:
+        record_source = None
+        line = line.strip()
+    if not line or not query.admits(line):
+        return False
+
+    if record_source is not None:
+        data = record_source.record # decoded once, shared by every consumer of the log
+    else:
+        data = decode_record(line)
+
+    if data is not None:
+        entry = RecordView(data)
+    elif query.uses_line:
         # allow raw matches(line, '...') queries against non-ndjson records
-        if 'line' in query:
-            entry = AttrDict(dict(raw=line,line=line))
-            pass
-        else:
-            # otherwise only NDJSON is considered
-            #print("!line in query !json", query, line)
-            return False
+        entry = RecordView(dict(raw=line,line=line))
+    else:
+        # otherwise only NDJSON is considered
+        return False
 
     context = {
         "line": line,
         "entry": entry,
-        "matches": matches,
-        "re": re,
-        "math": __import__("math")
     }
 
     try:
         # Use eval with restricted globals/locals
-        return eval(query, {}, context)
+        return eval(query.code, QUERY_GLOBALS, context)
     except Exception as e:
-        # Log explicit evaluation errors (syntax, name errors, etc.)
-        # We truncate line content if it's too long
-        trunc_line = (line[:75] + '..') if len(line) > 75 else line
-        print(f"[DIRECTOR] ERROR: Query Evaluation Failed: {e}")
-        print(f"  Query: {query}")
-        print(f"  Line: {trunc_line}")
+        # Log explicit evaluation errors (type errors, etc.) once per query
+        query.report_failure(e, line)
         return False
 
 # --- Environment Setup ---
-def get_dotnet_env():
-    """Retrieves the DOTNET_ROOT and PATH from ensure_dotnet.sh"""
-    try:
-
-        result = subprocess.run(maybe_wrap_bash_script(ENSURE_DOTNET), capture_output=True, text=True, check=True)
-        dotnet_root = result.stdout.strip()
-        env = os.environ.copy()
-        env["DOTNET_ROOT"] = dotnet_root
-        env["PATH"] = f"{dotnet_root}:{env.get('PATH', '')}"
-        return env
-    except subprocess.CalledProcessError as e:
-        print(f"Error initializing substrate: {e}")
-        # No cleanup needed here as nothing started yet
-        sys.exit(1)
+DOTNET_ENV_INPUTS = ("PATH", "DOTNET_ROOT") # environment ensure_dotnet.sh resolves against
+
+def get_dotnet_root():
+    """Runs ensure_dotnet.sh, unless it already vouched for an unchanged
+    dotnet installation with the same scripts and environment."""
+    inputs = {key: os.environ.get(key) for key in DOTNET_ENV_INPUTS}
+    entry = cached_entry("dotnet")
+    if entry and entry.get("inputs") == inputs:
+        return entry["root"]
+    result = subprocess.run(maybe_wrap_bash_script(ENSURE_DOTNET), capture_output=True, text=True, check=True)
+    dotnet_root = result.stdout.strip()
+    dotnet_exe = os.path.join(dotnet_root, "dotnet.exe" if platform.system() == "Windows" else "dotnet")
+    save_substrate_cache("dotnet", {
+        "fingerprint": file_fingerprint([ENSURE_DOTNET, OBSERVATORY_ENV, dotnet_exe]),
+        "inputs": inputs,
+        "root": dotnet_root
+    })
+    return dotnet_root
 
-ENV = get_dotnet_env()
+# DOTNET_ROOT and PATH are only resolved (see dotnet_env) once a block
+# launches a process, so scenarios that never do skip ensure_dotnet.sh.
+ENV = os.environ.copy()
 ENV["OPENSIM_DIR"] = OPENSIM_DIR
 ENV["OBSERVATORY_DIR"] = OBSERVATORY_DIR
 ENV["VIVARIUM_ROOT"] = VIVARIUM_DIR
 ENV["SIMULANT_FQN"] = SIMULANT_FQN
+dotnet_resolved = False
+
+def dotnet_env():
+    """Returns ENV with DOTNET_ROOT and PATH from ensure_dotnet.sh (resolved on first use)."""
+    global dotnet_resolved
+    if not dotnet_resolved:
+        try:
+            dotnet_root = get_dotnet_root()
+        except subprocess.CalledProcessError as e:
+            raise DirectorError(f"Error initializing substrate: {e}")
+        resolved = {"DOTNET_ROOT": dotnet_root, "PATH": f"{dotnet_root}:{ENV.get('PATH', '')}"}
+        ENV.update(resolved)
+        os.environ.update(resolved)
+        dotnet_resolved = True
+    return ENV
 
 # --- Console Abstraction ---
 
+LOCAL_CONSOLE_PROMPT = '#---#'
+LOCAL_CONSOLE_HISTORY = int(os.getenv("DIRECTOR_LOCAL_CONSOLE_HISTORY", "10000"))
+LOCAL_CONSOLE_TIMEOUT = 1.0 # seconds to collect a command's output when no timeout is given
+LOCAL_CONSOLE_READY = float(os.getenv("DIRECTOR_LOCAL_CONSOLE_READY", "10")) # seconds to wait for the prompt before sending
+
 class LocalConsole:
+    """OpenSim's own stdin/stdout console. A reader thread drains stdout
+    continuously (so a chatty simulator never blocks on a full pipe) into
+    opensim_console.log and an in-memory line queue, and signals `prompt`
+    whenever the console prompt appears."""
+
     def __init__(self, process):
         self.process = process
         self.connected = True
+        self.lines = collections.deque(maxlen=LOCAL_CONSOLE_HISTORY)
+        self.cond = threading.Condition()
+        self.prompt = threading.Event()
+        self.log_path = os.path.join(OBSERVATORY_DIR, "opensim_console.log")
+        self.reader = threading.Thread(target=self._drain, name="LocalConsoleReader", daemon=True)
+        self.reader.start()
+
+    def _drain(self):
+        fd = self.process.stdout.fileno()
+        partial = ''
+        with open(self.log_path, 'a', encoding='utf-8') as log:
+            while True:
+                try:
+                    chunk = os.read(fd, 65536)
+                except OSError:
+                    chunk = b''
+                if not chunk:
+                    break
+                lines = (partial + chunk.decode(errors='replace')).split('\n')
+                partial = lines.pop()
+                # The prompt is written without a trailing newline
+                if partial.rstrip() == LOCAL_CONSOLE_PROMPT:
+                    lines.append(partial)
+                    partial = ''
+                log.write(''.join(line + '\n' for line in lines))
+                log.flush()
+                with self.cond:
+                    for line in lines:
+                        line = line.rstrip()
+                        if (os.getenv("DIRECTOR_DEBUG")): print("SNARFING...", line)
+                        if line == LOCAL_CONSOLE_PROMPT:
+                            self.prompt.set()
+                        elif line:
+                            self.lines.append(line)
+                    self.cond.notify_all()
+            if partial:
+                log.write(partial + '\n')
+        with self.cond:
+            self.connected = False
+            self.cond.notify_all()
 
     def send(self, command, timeout=None):
+        """Runs one console command; `timeout` (seconds) bounds how long its
+        output is collected, as for the REST console."""
         if not (self.connected and self.process and self.process.poll() is None):
             print("[DIRECTOR] LOCAL Console not connected.")
             assert False
@@ -213,52 +580,41 @@ class LocalConsole:
         print(f"  -> OpenSim Command (LOCAL): {command}")
         director_emit(sys='DEBUG', sig='LOCAL', val=command)
 
-        # absorb all stdout up through current
-        def absorb(timeout, match=None):
-            import os
-            start_time = time.time()
-            found = False
-            line = ''
-            while time.time() - start_time < timeout:
-                os.set_blocking(self.process.stdout.fileno(), False)
-                try:
-                    while line := self.process.stdout.readline().decode().rstrip():
-                        if match and match(line):
-                            found = True
-                            print(f"  -> Verified: {line}")
-                            return True, line
-                        if (os.getenv("DIRECTOR_DEBUG")): print("SNARFING...", line)
-                    time.sleep(0.1)
-                    if (os.getenv("DIRECTOR_DEBUG")): print("SNARFING...", time.time() - start_time, timeout)
-                finally:
-                    os.set_blocking(self.process.stdout.fileno(), True)
-            return found, line
-        # wait for prompt
-        if timeout:
-            ok, line = absorb(timeout, match=lambda line: line == '#---#')
-        else:
-            ok, line = absorb(0.5, match=lambda line: False)
-            ok = True # just absorb no prompt detection if not timeout
-        if not ok:
-            raise DirectorError('#---# not found (LOCAL opensim console REPL prompt unavailable?)')
+        # wait for the console to be ready (booted, previous command done)
+        if not self.prompt.wait(LOCAL_CONSOLE_READY):
+            print(f"[DIRECTOR] Warning: no LOCAL console prompt after {LOCAL_CONSOLE_READY:g}s; sending anyway.")
 
         try:
-            if (os.getenv("DIRECTOR_DEBUG")): print("a", ok, line)
+            with self.cond:
+                # discard output logged since the previous command
+                self.lines.clear()
+                self.prompt.clear()
             self.process.stdin.write((command + "\r\n").encode())
-            if (os.getenv("DIRECTOR_DEBUG")): print("b")
             self.process.stdin.flush()
-            if (os.getenv("DIRECTOR_DEBUG")): print("c")
 
-            ok, line = absorb(1, lambda x: x) #self.process.stdout.readline().decode()
-            if (os.getenv("DIRECTOR_DEBUG")): print("d", ok, line)
-            director_emit(sys='DEBUG', sig='LOCAL', val=line[0:64]+'...')
-            return dict(response=line)
+            # collect output until the console prompts again
+            deadline = time.time() + (timeout or LOCAL_CONSOLE_TIMEOUT)
+            with self.cond:
+                while not self.prompt.is_set() and self.connected:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                complete = self.prompt.is_set()
+                output = list(self.lines)
+            response = "\n".join(output)
+            director_emit(sys='DEBUG', sig='LOCAL', val=response[0:64]+'...')
+            return dict(command=command, response=response, status="OK" if complete else "TIMEOUT", complete=complete)
         except Exception as e:
             print(f"[DIRECTOR] Error sending LOCAL command: {e}")
             self.connected = False
             raise e
         return None
 
+    def send_batch(self, commands, timeout=None):
+        """The local console has no pipelining; commands run one by one."""
+        return [self.send(command, timeout=timeout) for command in commands]
+
     def close(self):
         pass
 
@@ -325,31 +681,18 @@ class RestConsole:
 
         return True
 
-    def send(self, command, timeout=0.5):
-        if not self._ensure_connected():
-            print("[DIRECTOR] REST Console not connected.")
-            assert False
-            return None
-
-        print(f"  -> OpenSim Command (REST): {command}")
-        director_emit(sys='DEBUG', sig='REST', val=command)
+    def _exchange(self, request):
+        """Writes one request line to the daemon and reads its JSON reply."""
         try:
-            self.daemon_proc.stdin.write(command + "\n")
+            self.daemon_proc.stdin.write(request + "\n")
             self.daemon_proc.stdin.flush()
 
             # Read response (blocking for now, as daemon is synchronous)
-            # The daemon emits exactly one JSON line per command
+            # The daemon emits exactly one JSON line per request
             line = self.daemon_proc.stdout.readline()
             if line:
                 try:
-                    resp = json.loads(line)
-                    if "response" in resp:
-                        # Log the response to stdout for visibility?
-                        director_emit(sys='DEBUG', sig='REST', val=str(resp['response'])[0:64]+'...')
-                    if "error" in resp:
-                        director_emit(sys='DEBUG', sig='REST', val='ERROR:'+str(resp['error']))
-                        print(f"[DIRECTOR] REST Error: {resp['error']}")
-                    return resp
+                    return json.loads(line)
                 except json.JSONDecodeError:
                     print(f"[DIRECTOR] Invalid REST response: {line.strip()}")
             else:
@@ -360,6 +703,68 @@ class RestConsole:
             self.connected = False
         return None
 
+    def _log_response(self, resp):
+        if "response" in resp:
+            # Log the response to stdout for visibility?
+            director_emit(sys='DEBUG', sig='REST', val=str(resp['response'])[0:64]+'...')
+        if "error" in resp:
+            director_emit(sys='DEBUG', sig='REST', val='ERROR:'+str(resp['error']))
+            print(f"[DIRECTOR] REST Error: {resp['error']}")
+
+    def send(self, command, timeout=None):
+        """Runs one console command; `timeout` (seconds) bounds how long the
+        daemon collects its output (daemon default when None)."""
+        if not self._ensure_connected():
+            print("[DIRECTOR] REST Console not connected.")
+            assert False
+            return None
+
+        print(f"  -> OpenSim Command (REST): {command}")
+        director_emit(sys='DEBUG', sig='REST', val=command)
+        resp = self._execute(command, timeout)
+        if resp is not None:
+            self._log_response(resp)
+        return resp
+
+    def send_batch(self, commands, timeout=None):
+        """Runs several console commands in one pipelined burst: all are
+        submitted before any output is collected, and each reply is matched
+        to its command by the console's echo. Returns one result per command
+        (None for all of them if the daemon did not answer); `timeout`
+        (seconds) covers the whole batch."""
+        commands = list(commands)
+        if not self._ensure_connected():
+            print("[DIRECTOR] REST Console not connected.")
+            assert False
+            return None
+
+        for command in commands:
+            print(f"  -> OpenSim Command (REST batch): {command}")
+        director_emit(sys='DEBUG', sig='REST', val=f"BATCH: {len(commands)} commands")
+        results = self._execute_batch(commands, timeout)
+        for result in results:
+            if result is not None:
+                self._log_response(result)
+        return results
+
+    def _execute(self, command, timeout):
+        if timeout is None:
+            request = command
+        else:
+            request = json.dumps({"command": command, "timeout": timeout})
+        return self._exchange(request)
+
+    def _execute_batch(self, commands, timeout):
+        request = {"batch": commands}
+        if timeout is not None:
+            request["timeout"] = timeout
+        resp = self._exchange(json.dumps(request))
+        if resp is None:
+            return [None] * len(commands)
+        if "error" in resp:
+            return [resp] * len(commands)
+        return resp.get("batch", [])
+
     def close(self):
         if self.daemon_proc:
             print("[DIRECTOR] Terminating REST Console Daemon...")
@@ -374,6 +779,157 @@ class RestConsole:
             finally:
                 self.daemon_proc = None
 
+def load_console_daemon():
+    """Imports the REST console protocol module (console_daemon.py)."""
+    if REST_CONSOLE_DIR not in sys.path:
+        sys.path.insert(0, REST_CONSOLE_DIR)
+    import console_daemon
+    return console_daemon
+
+class InProcessRestConsole(RestConsole):
+    """RestConsole that speaks the REST console protocol from this process
+    (same ConsoleSession logic as the daemon, without the subprocess, bash
+    wrapper and pipe). A lock serializes commands issued by the main thread
+    and by sensor threads, since they share one console session."""
+
+    def __init__(self, process, url="http://127.0.0.1:9000", user="RestUser", password="RestPassword"):
+        super().__init__(process, url=url, user=user, password=password)
+        self.protocol = load_console_daemon()
+        self.session = None
+        self.lock = threading.RLock()
+
+    def _ensure_connected(self):
+        with self.lock:
+            if self.session:
+                return True
+
+            print("[DIRECTOR] Connecting in-process REST Console...")
+            session = self.protocol.ConsoleSession(self.url, self.user, self.password)
+            timeout = float(ENV.get("OPENSIM_TIMEOUT", "15"))
+            st = time.time()
+            while (time.time() - st) < timeout:
+                if session.connect():
+                    self.session = session
+                    self.connected = True
+                    director_emit(sys='DEBUG', sig='REST', val='connected')
+                    return True
+                time.sleep(0.25)
+            session.close()
+            director_emit(sys='DEBUG', sig='REST', val=f"Failed to connect (TIMEOUT={timeout}s)")
+            return False
+
+    def _execute(self, command, timeout):
+        with self.lock:
+            return self.protocol.execute(self.session, command,
+                                         self.protocol.DEFAULT_COMMAND_TIMEOUT if timeout is None else timeout)
+
+    def _execute_batch(self, commands, timeout):
+        with self.lock:
+            return self.protocol.execute_batch(self.session, commands,
+                                               self.protocol.DEFAULT_COMMAND_TIMEOUT if timeout is None else timeout)
+
+    def close(self):
+        with self.lock:
+            if self.session:
+                print("[DIRECTOR] Closing in-process REST Console...")
+                self.session.close()
+                self.session = None
+                self.connected = False
+
+def make_rest_console(process):
+    """The REST console client selected by OPENSIM_REST_CLIENT."""
+    if os.environ.get("OPENSIM_REST_CLIENT", "daemon").lower() == "inprocess":
+        return InProcessRestConsole(process)
+    return RestConsole(process)
+
+class ConsoleMux:
+    """Multiplexes concurrent senders (the scenario thread, sensors) onto one
+    console. Each request gets an ID and a future; a single writer thread
+    owns the console, so request/response pairs can never interleave.
+    Each call is executed on its own, with its own timeout; only commands
+    passed together to send_batch() share one console batch."""
+
+    def __init__(self, console):
+        self.console = console
+        self.requests = queue.Queue()
+        self.ids = itertools.count(1)
+        self.closed = False
+        self.writer = threading.Thread(target=self._run, name="ConsoleMux", daemon=True)
+        self.writer.start()
+
+    def submit(self, command, timeout=None):
+        """Queues one command; returns a Future resolving to its result."""
+        return self._submit([command], timeout)[0]
+
+    def send(self, command, timeout=None):
+        return self.submit(command, timeout).result()
+
+    def submit_batch(self, commands, timeout=None):
+        """Queues commands to run as one console batch (`timeout` covers the
+        whole batch); returns one Future per command."""
+        return self._submit(list(commands), timeout)
+
+    def send_batch(self, commands, timeout=None):
+        return [future.result() for future in self.submit_batch(commands, timeout)]
+
+    def _submit(self, commands, timeout):
+        futures = []
+        for command in commands:
+            future = concurrent.futures.Future()
+            future.request_id = next(self.ids)
+            futures.append(future)
+        if self.closed:
+            for future in futures:
+                future.set_exception(DirectorError("Console closed"))
+            return futures
+        # One queue entry per call keeps a caller's batch contiguous
+        self.requests.put((list(zip(futures, commands)), timeout))
+        return futures
+
+    def _run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            entries, timeout = request
+
+            futures = [future for future, command in entries if future.set_running_or_notify_cancel()]
+            commands = [command for future, command in entries if future in futures]
+            if not commands:
+                continue
+            director_emit(sys='DEBUG', sig='CONSOLE', val=dict(ids=[f.request_id for f in futures], commands=len(commands)))
+            try:
+                if len(entries) == 1:
+                    results = [self.console.send(commands[0], timeout=timeout)]
+                else:
+                    results = self.console.send_batch(commands, timeout=timeout)
+                results = list(results) + [None] * (len(futures) - len(results))
+                for future, result in zip(futures, results):
+                    if isinstance(result, dict):
+                        result = dict(result, id=future.request_id)
+                    future.set_result(result)
+            except BaseException as e:
+                for future in futures:
+                    future.set_exception(e)
+
+        # Fail whatever is still queued after close()
+        while True:
+            try:
+                request = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                for future, command in request[0]:
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(DirectorError("Console closed"))
+
+    def close(self):
+        self.closed = True
+        self.requests.put(None)
+        if threading.current_thread() is not self.writer:
+            self.writer.join(timeout=5)
+        self.console.close()
+
 # Sync with os.environ so os.path.expandvars works immediately
 os.environ.update(ENV)
 
@@ -408,8 +964,15 @@ def cleanup_graceful():
             except Exception as e:
                 print(f"[DIRECTOR] Error terminating {name}: {e}")
 
-    # 2. Terminate OpenSim
-    if opensim_proc and opensim_proc.poll() is None:
+    # 2. Terminate OpenSim (a warm territory stays up for the next run)
+    if territory_relay:
+        territory_relay.stop()
+    if warm_attach:
+        warm_attach[1].close() # certified but never used by a territory block
+    if isinstance(opensim_proc, WarmTerritoryProcess):
+        if opensim_proc.poll() is None:
+            print(f"[DIRECTOR] Leaving warm territory running (PID {opensim_proc.pid}).")
+    elif opensim_proc and opensim_proc.poll() is None:
         print("[DIRECTOR] Terminating OpenSim...")
         try:
             opensim_proc.terminate()
@@ -425,6 +988,12 @@ def cleanup_graceful():
     # 3. Stop Async Sensors
     for sensor in active_sensors:
         sensor.stop()
+    for hub in sensor_hubs.values():
+        hub.stop()
+    if user_account_watcher:
+        user_account_watcher.close()
+
+    release_warm_lease()
 
     director_emit(sys='DEBUG', sig='SHUTDOWN', val='Shutdown complete...')
     print("[DIRECTOR] Shutdown complete.")
@@ -460,58 +1029,987 @@ def signal_handler(sig, frame):
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
+# --- Warm Territory ---
+# With DIRECTOR_WARM_TERRITORY=1 the simulant outlives the Director: it is
+# booted under territory_supervisor.py and later runs attach to it instead of
+# booting their own. Scenarios that test boot opt out with `Warm: false`.
+
+WARM_TERRITORY = os.getenv("DIRECTOR_WARM_TERRITORY", "0") == "1"
+WARM_IDLE = os.getenv("DIRECTOR_WARM_IDLE", "1800") # seconds unleased before the supervisor stops the simulant
+WARM_STATE = os.path.join(VIVARIUM_DIR, "territory.warm.json")
+WARM_LOCK = os.path.join(VIVARIUM_DIR, "territory.warm.lock")
+WARM_ENCOUNTER_LOG = os.path.join(VIVARIUM_DIR, "territory.warm.log")
+WARM_SUPERVISOR_LOG = os.path.join(VIVARIUM_DIR, "territory.warm.supervisor.log")
+WARM_BASELINE_OAR = os.path.join(VIVARIUM_DIR, "territory.warm.oar")
+TERRITORY_SUPERVISOR = os.path.join(SCRIPT_DIR, "territory_supervisor.py")
+WARM_AGENT_ROW = re.compile(r'^(\S+)\s+(\S+)\s+[0-9a-fA-F-]{36}\s+Root\b', re.MULTILINE) # `show users`
+
+warm_lease = None # lock file held while this run uses the warm territory
+warm_attach = None # (process, console) certified before the first block
+territory_relay = None
+
+class WarmTerritoryProcess:
+    """
+    The simulant kept by territory_supervisor.py, behind the part of the
+    Popen interface the Director uses (pid, poll, wait, terminate, kill).
+    Terminating it asks the supervisor to shut the simulant down.
+    """
+    def __init__(self, state):
+        self.pid = state["pid"]
+        self.supervisor_pid = state["supervisor_pid"]
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None and not pid_alive(self.pid):
+            state = read_warm_state() or {}
+            self.returncode = state.get("returncode", -1) if state.get("pid") == self.pid else -1
+        return self.returncode
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.time() >= deadline:
+                raise subprocess.TimeoutExpired(f"warm territory (PID {self.pid})", timeout)
+            time.sleep(0.1)
+        return self.returncode
+
+    def terminate(self):
+        try:
+            os.kill(self.supervisor_pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self._signal(self.pid, signal.SIGTERM) # supervisor gone: signal the simulant directly
+
+    def kill(self):
+        self._signal(self.supervisor_pid, signal.SIGKILL)
+        self._signal(self.pid, signal.SIGKILL)
+
+    def _signal(self, pid, sig):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+class LogRelay(threading.Thread):
+    """
+    Copies what the warm simulant appends to its long-lived encounter log
+    into this run's encounter log, starting at `offset`, so Territory
+    subjects only see events from this run.
+    """
+    def __init__(self, src, dst, offset=0):
+        super().__init__(name="territory-relay", daemon=True)
+        self.src = src
+        self.dst = dst
+        self.offset = offset
+        self.stop_event = threading.Event()
+
+    def _copy(self, out):
+        try:
+            f = open(self.src, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            if os.fstat(f.fileno()).st_size < self.offset:
+                self.offset = 0 # truncated or replaced (simulant rebooted)
+            f.seek(self.offset)
+            while data := f.read(LOG_TAIL_CHUNK):
+                out.write(data)
+                self.offset += len(data)
+        out.flush()
+
+    def run(self):
+        watcher = get_log_watcher()
+        with open(self.dst, 'ab') as out:
+            while True:
+                snapshot = watcher.snapshot([self.src]) # before copying: no lost wakeups
+                self._copy(out)
+                if self.stop_event.is_set():
+                    break
+                watcher.wait(snapshot, 1.0, 0.05, self.stop_event)
+
+    def stop(self):
+        self.stop_event.set()
+        get_log_watcher().interrupt()
+        self.join(timeout=2)
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def read_warm_state():
+    """The supervisor's state file (None if there is none)."""
+    try:
+        with open(WARM_STATE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def warm_alive(state):
+    return bool(state) and "returncode" not in state and pid_alive(state["pid"])
+
+def use_warm_territory():
+    """Warm mode applies to REST console runs whose scenario does not opt out."""
+    if not WARM_TERRITORY or os.environ.get("OPENSIM_CONSOLE", "rest").lower() != "rest":
+        return False
+    return SCENARIO_METADATA.get("Warm", "true").lower() not in ("false", "no", "0")
+
+def territory_key():
+    """Hash of the configuration a warm simulant was booted from."""
+    digest = hashlib.sha256()
+    digest_simulant_config(digest)
+    return digest.hexdigest()[:16]
+
+def acquire_warm_lease():
+    """Takes the lease on the warm territory for this run (one Director at a time)."""
+    global warm_lease
+    if warm_lease:
+        return
+    try:
+        import fcntl
+    except ImportError:
+        raise DirectorError("Warm territory mode needs POSIX file locks (fcntl)")
+    lease = open(WARM_LOCK, "a")
+    try:
+        fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lease.close()
+        raise DirectorError(f"The warm territory is in use by another Director run (lock {WARM_LOCK})")
+    os.utime(WARM_LOCK)
+    warm_lease = lease
+
+def release_warm_lease():
+    """Hands the warm territory back; the supervisor's idle clock starts now."""
+    global warm_lease
+    if warm_lease:
+        import fcntl
+        os.utime(WARM_LOCK)
+        fcntl.flock(warm_lease, fcntl.LOCK_UN)
+        warm_lease.close()
+        warm_lease = None
+
+def stop_warm_territory(state):
+    proc = WarmTerritoryProcess(state)
+    print(f"[DIRECTOR] Stopping warm territory (PID {proc.pid})...")
+    proc.terminate()
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        print("[DIRECTOR] Killing warm territory...")
+        proc.kill()
+        proc.wait(timeout=5)
+
+def prepare_warm_territory():
+    """
+    Runs before the first block and decides whether this run attaches to the
+    live warm territory: it must have been booted from the current
+    configuration and pass the preflight. Only then is it kept (bash blocks
+    see TERRITORY_WARM=1 and leave its databases and logs alone); otherwise
+    it is stopped and the run boots on a fresh habitat.
+    """
+    global warm_attach
+    state = read_warm_state()
+    alive = warm_alive(state)
+    if not use_warm_territory():
+        if alive:
+            acquire_warm_lease()
+            stop_warm_territory(state)
+            release_warm_lease()
+        return
+    acquire_warm_lease()
+    if not alive:
+        return
+    if state.get("key") != territory_key():
+        print("[DIRECTOR] Warm territory was booted from a different configuration; stopping it.")
+        stop_warm_territory(state)
+        return
+    proc = WarmTerritoryProcess(state)
+    console = ConsoleMux(make_rest_console(proc))
+    try:
+        remote_pid = preflight_territory(console)
+    except Exception as e:
+        print(f"[DIRECTOR] Warm territory preflight failed: {e!r}")
+        remote_pid = None
+    if remote_pid != proc.pid:
+        print(f"[DIRECTOR] Warm territory did not pass the preflight (got PID {remote_pid}); stopping it.")
+        console.close()
+        stop_warm_territory(state)
+        return
+    print(f"[DIRECTOR] Preflight Success: warm territory available (PID {remote_pid}); keeping its habitat.")
+    warm_attach = (proc, console)
+    ENV["TERRITORY_WARM"] = "1"
+    hide_earlier_runs(state)
+
+def preflight_territory(console):
+    """Preflight certification: returns the process id the console reports (None if unreadable)."""
+    print("[DIRECTOR] Preflight Certifying OpenSim Connection...")
+    resp = console.send("env processid", timeout=10)
+    try:
+        return int(resp["response"])
+    except:
+        print(f"[DIRECTOR] Warning: Could not parse processid from '{resp}'")
+        return None
+
+def certify_territory(console, pid):
+    """Runs the preflight on a freshly started simulant; raises DirectorError
+    if the console belongs to another OpenSim."""
+    remote_pid = preflight_territory(console)
+    if remote_pid != pid:
+        msg = f"PID Mismatch! Connected to OpenSim PID {remote_pid}, but expected PID {pid}. " \
+            f"This usually means a background OpenSim instance is blocking port 9000."
+        print(f"[DIRECTOR] CRITICAL ERROR: {msg}")
+        raise DirectorError(msg)
+    print(f"[DIRECTOR] Preflight Success: Connected to PID {remote_pid}.")
+
+def clear_habitat_state():
+    """Removes the databases and logs a stopped warm territory left behind,
+    which prepare_habitat.md kept for it."""
+    for path in glob.glob(os.path.join(OBSERVATORY_DIR, "*.db*")) + [
+            os.path.join(OBSERVATORY_DIR, "opensim.log"), os.path.join(OBSERVATORY_DIR, "opensim.pid")]:
+        if os.path.exists(path):
+            os.remove(path)
+        log_hidden_ranges.pop(os.path.abspath(path), None)
+    ENV.pop("TERRITORY_WARM", None)
+
+def reset_warm_territory(console):
+    """
+    Returns the region to its post-boot state between runs: agents left over
+    from earlier runs are kicked and the baseline OAR saved at boot is loaded.
+    DIRECTOR_WARM_RESET adds further console commands (';'-separated).
+    """
+    start_time = time.time()
+    resp = console.send("show users", timeout=5) or {}
+    agents = WARM_AGENT_ROW.findall(str(resp.get("response", "")))
+    commands = [f"kick user {first} {last} --force" for first, last in agents]
+    if os.path.exists(WARM_BASELINE_OAR):
+        commands.append(f"load oar {WARM_BASELINE_OAR}")
+    commands += [command.strip() for command in os.getenv("DIRECTOR_WARM_RESET", "").split(";") if command.strip()]
+    if commands:
+        console.send_batch(commands, timeout=60)
+    ms = int((time.time() - start_time) * 1000)
+    print(f"[DIRECTOR] Warm territory reset ({len(agents)} agents kicked, {len(commands)} commands) in {ms}ms.")
+    director_emit(sys='DEBUG', sig='WARM_RESET', val=dict(agents=[" ".join(agent) for agent in agents], commands=len(commands), ms=ms))
+
+def record_boot_log(state):
+    """
+    Records where the boot run's part of opensim.log ends in the state file:
+    runs that attach later keep seeing the boot lines (region up, logins
+    enabled) but not what the runs in between appended.
+    """
+    try:
+        st = os.stat(os.path.join(OBSERVATORY_DIR, "opensim.log"))
+    except OSError:
+        return
+    state = dict(state, boot_log=dict(size=st.st_size, identity=[st.st_dev, st.st_ino]))
+    tmp = f"{WARM_STATE}.tmp{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=4)
+    os.replace(tmp, WARM_STATE)
+
+def hide_earlier_runs(state):
+    """Hides the lines earlier runs appended to the warm simulant's opensim.log."""
+    log_path = os.path.join(OBSERVATORY_DIR, "opensim.log")
+    boot_log = state.get("boot_log") or {}
+    try:
+        st = os.stat(log_path)
+    except OSError:
+        return
+    keep = boot_log.get("size", 0) if boot_log.get("identity") == [st.st_dev, st.st_ino] else 0
+    hide_log_range(log_path, keep)
+    _, start, end = log_hidden_ranges.get(os.path.abspath(log_path), (None, 0, 0))
+    print(f"[DIRECTOR] Hiding {end - start} bytes of opensim.log left by earlier runs.")
+
+def start_territory_relay(encounter_log, offset):
+    global territory_relay
+    territory_relay = LogRelay(WARM_ENCOUNTER_LOG, encounter_log, offset)
+    territory_relay.start()
+
+def boot_warm_territory(cmd, proc_env, key, encounter_log):
+    """Boots the simulant under territory_supervisor.py and saves the baseline OAR."""
+    for stale in (WARM_STATE, WARM_ENCOUNTER_LOG, WARM_BASELINE_OAR):
+        if os.path.exists(stale):
+            os.remove(stale)
+    proc_env = dict(proc_env, OPENSIM_ENCOUNTER_LOG=WARM_ENCOUNTER_LOG)
+    supervisor_cmd = [sys.executable, TERRITORY_SUPERVISOR,
+        "--state", WARM_STATE, "--lock", WARM_LOCK, "--key", key, "--idle", WARM_IDLE, "--"] + cmd
+    print("[warm.cmd] ", " ".join(supervisor_cmd), file=sys.stderr)
+    with open(WARM_SUPERVISOR_LOG, "w") as log:
+        supervisor = subprocess.Popen(
+            supervisor_cmd,
+            cwd=OPENSIM_DIR,
+            env=proc_env,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True # outlives this run (and its Ctrl-C)
+        )
+
+    deadline = time.time() + 10
+    while (state := read_warm_state()) is None:
+        if supervisor.poll() is not None or time.time() > deadline:
+            raise DirectorError(f"Territory supervisor failed to start (see {WARM_SUPERVISOR_LOG})")
+        time.sleep(0.05)
+
+    proc = WarmTerritoryProcess(state)
+    director_emit(sys='DEBUG', sig='OPENSIM', val=dict(pid=proc.pid, cmd=cmd, warm='boot'))
+    print(f"[DIRECTOR] OpenSim started as warm territory (PID {proc.pid}, supervisor PID {supervisor.pid})")
+    start_territory_relay(encounter_log, 0)
+
+    console = ConsoleMux(make_rest_console(proc))
+    try:
+        certify_territory(console, proc.pid)
+    except DirectorError:
+        console.close()
+        proc.terminate()
+        raise
+    console.send(f"save oar {WARM_BASELINE_OAR}", timeout=30)
+    record_boot_log(state)
+    return proc, console
+
+def attach_warm_territory(cmd, proc_env, encounter_log):
+    """
+    Returns (process, console) for this run's warm territory: the simulant
+    certified by prepare_warm_territory (after resetting its region), or a
+    fresh boot when there is none or the scenario has since changed the
+    configuration.
+    """
+    global warm_attach
+    acquire_warm_lease()
+    key = territory_key()
+    if warm_attach:
+        proc, console = warm_attach
+        warm_attach = None
+        state = read_warm_state() or {}
+        if proc.poll() is None and state.get("key") == key:
+            start_time = time.time()
+            reset_warm_territory(console)
+            try:
+                offset = os.path.getsize(WARM_ENCOUNTER_LOG)
+            except OSError:
+                offset = 0
+            start_territory_relay(encounter_log, offset)
+            print(f"[DIRECTOR] Attached to warm territory (PID {proc.pid}).")
+            director_emit(sys='DEBUG', sig='OPENSIM', val=dict(pid=proc.pid, cmd=state.get("cmd"), warm='attach', ms=int((time.time() - start_time) * 1000)))
+            return proc, console
+        print("[DIRECTOR] Warm territory died or its configuration changed during this run; booting a fresh one.")
+        console.close()
+        if proc.poll() is None:
+            stop_warm_territory(state)
+        clear_habitat_state() # kept by prepare_habitat.md for the old simulant
+    return boot_warm_territory(cmd, proc_env, key, encounter_log)
+
 # --- Reporting ---
 
+REPORT_WIDTH = 110 # OBSERVATION | FRAME | RESULT | TYPE | LAG
+
 def print_report(error=None):
-    print("\n" + "="*100)
+    print("\n" + "="*REPORT_WIDTH)
     title_line = "NATURALIST OBSERVATORY: EXPEDITION REPORT"
     if SCENARIO_METADATA.get("Title"):
         title_line += f" ({SCENARIO_METADATA['Title']})"
-    print(f"{title_line:^100}")
-    print("="*100)
-    print(f"{'OBSERVATION':<40} | {'FRAME':<30} | {'RESULT':<10} | {'TYPE':<10}")
-    print("-" * 100)
+    print(f"{title_line:^{REPORT_WIDTH}}")
+    print("="*REPORT_WIDTH)
+    print(f"{'OBSERVATION':<40} | {'FRAME':<30} | {'RESULT':<10} | {'TYPE':<10} | {'LAG':>7}")
+    print("-" * REPORT_WIDTH)
 
     all_passed = True
+    estimated_lag = False
     for entry in evidence_log:
         status = "PASSED" if entry['passed'] else "FAILED"
+        if entry.get('skipped'):
+            status = "SKIPPED"
         if not entry['passed']:
             all_passed = False
 
         # Infer type from title/frame if not present, but AWAIT usually implies Event
         obs_type = entry.get('type', 'State')
 
-        print(f"{entry['title']:<40} | {entry['frame']:<30} | {status:<10} | {obs_type:<10}")
+        # Detection lag: Director noticed-at minus the event's 'at' ('~': the log's mtime)
+        detection = entry.get('detection') or {}
+        lag_ms = detection.get('lag_ms')
+        lag = "-" if lag_ms is None else f"~{lag_ms}ms" if detection.get('lag_from') == 'mtime' else f"{lag_ms}ms"
+        estimated_lag = estimated_lag or lag.startswith("~")
+
+        print(f"{entry['title']:<40} | {entry['frame']:<30} | {status:<10} | {obs_type:<10} | {lag:>7}")
         if not entry['passed']:
             print(f"  -> EVIDENCE MISSING: {entry['details']}")
 
-    print("="*100)
+    if estimated_lag:
+        print("  ~ LAG measured from the log's modification time (the event has no 'at' timestamp)")
+    print("="*REPORT_WIDTH)
+    observed = [entry for entry in evidence_log if not entry.get('skipped')]
     if SIGINT_COUNT > 0:
-        print(f"{'MISSION ABORTED (INTERRUPT)':^100}")
+        print(f"{'MISSION ABORTED (INTERRUPT)':^{REPORT_WIDTH}}")
     elif error:
-        print(f"{'MISSION ABORTED (ERROR)':^100}")
-    elif all_passed and evidence_log:
-        print(f"{'MISSION SUCCESS':^100}")
-    elif not evidence_log:
-        print(f"{'NO OBSERVATIONS RECORDED':^100}")
+        print(f"{'MISSION ABORTED (ERROR)':^{REPORT_WIDTH}}")
+    elif all_passed and observed:
+        print(f"{'MISSION SUCCESS':^{REPORT_WIDTH}}")
+    elif not observed:
+        print(f"{'NO OBSERVATIONS RECORDED':^{REPORT_WIDTH}}")
     else:
-        print(f"{'MISSION FAILURE':^100}")
-    print("="*100 + "\n")
+        print(f"{'MISSION FAILURE':^{REPORT_WIDTH}}")
+    print("="*REPORT_WIDTH + "\n")
 
-def log_observation(title, frame, passed, details, obs_type="State"):
+    if director_log:
+        emit_detection_summary()
+
+def log_observation(title, frame, passed, details, obs_type="State", detection=None, skipped=False):
     evidence_log.append({
         "title": title,
         "frame": frame,
         "passed": passed,
         "details": details,
-        "type": obs_type
+        "type": obs_type,
+        "detection": detection,
+        "skipped": skipped
     })
 
+def parse_event_time(at):
+    """Parses an ISO-8601 'at' timestamp (e.g. 2025-01-01T00:00:00.123Z) to epoch seconds."""
+    if not isinstance(at, str):
+        return None
+    # Normalize for fromisoformat: 'Z' suffix, and at most 6 fractional digits
+    at = re.sub(r'(\.\d{6})\d+', r'\1', at.strip()).replace('Z', '+00:00')
+    try:
+        stamp = datetime.datetime.fromisoformat(at)
+    except ValueError:
+        return None
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=datetime.timezone.utc)
+    return stamp.timestamp()
+
+def format_wall_time(stamp):
+    return datetime.datetime.fromtimestamp(stamp, datetime.timezone.utc).isoformat().replace("+00:00", "Z")
+
+def measure_detection(line, noticed=None):
+    """
+    Detection lag for a matched log line: the wall time the Director noticed
+    the match minus the event's own 'at' timestamp. Lines without a parseable
+    'at' fall back to the time the line was appended to the log (the log's
+    modification time when the tail read it, LogLine only), marked with
+    lag_from='mtime'; that time can be later than the actual write when the
+    log was written more than once between reads.
+    Returns None when neither can be measured.
+    """
+    noticed = time.time() if noticed is None else noticed
+    record = line.record if isinstance(line, LogLine) else decode_record(line)
+    event_at = parse_event_time(record.get('at')) if record else None
+    appended_at = line.appended_at if isinstance(line, LogLine) else None
+    if event_at is None and appended_at is None:
+        return None
+
+    detection = {"noticed_at": format_wall_time(noticed)}
+    if appended_at is not None:
+        detection["appended_at"] = format_wall_time(appended_at)
+    if event_at is not None:
+        detection["event_at"] = record.get('at')
+        detection["lag_from"] = "at"
+        detection["lag_ms"] = int(round((noticed - event_at) * 1000))
+    else:
+        detection["lag_from"] = "mtime"
+        detection["lag_ms"] = max(0, int(round((noticed - appended_at) * 1000)))
+    return detection
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty sorted list."""
+    rank = max(1, int(-(-pct * len(values) // 100)))
+    return values[min(rank, len(values)) - 1]
+
+detection_summary_emitted = False
+
+def emit_detection_summary():
+    """Writes detection-lag percentiles (per observation type and overall) to the director log."""
+    global detection_summary_emitted
+    if detection_summary_emitted:
+        return
+    detection_summary_emitted = True
+
+    by_type = {}
+    for entry in evidence_log:
+        lag_ms = (entry.get('detection') or {}).get('lag_ms')
+        if lag_ms is not None:
+            by_type.setdefault(entry.get('type', 'State'), []).append(lag_ms)
+    if by_type:
+        by_type['All'] = [lag_ms for lags in by_type.values() for lag_ms in lags]
+
+    for obs_type, lags in by_type.items():
+        lags.sort()
+        summary = dict(type=obs_type, count=len(lags), p50=percentile(lags, 50), p90=percentile(lags, 90), p99=percentile(lags, 99), max=lags[-1])
+        director_emit(sys='METRICS', sig='DETECTION_LAG', val=summary)
+
+# --- Log Tailing ---
+
+LOG_TAIL_HISTORY = int(os.getenv("DIRECTOR_LOG_TAIL_HISTORY", "100000")) # lines retained per log
+LOG_TAIL_CHUNK = 1 << 20
+LOG_RECORD_CACHE = int(os.getenv("DIRECTOR_LOG_RECORD_CACHE", "20000")) # decoded records retained per log
+
+_UNDECODED = object()
+_UNCACHED = object() # fell out of the record ring: decode on demand, never keep
+
+class LogLine:
+    """
+    One line of a tailed log, keyed by its byte offset, with the time it was
+    appended (the log's modification time when the line was read: the line
+    was written no later than that), from which detection lag is measured.
+    The NDJSON record is decoded at most once and shared by all consumers
+    while the line is in its tail's record ring; older lines decode afresh.
+    """
+    __slots__ = ("offset", "text", "appended_at", "_record")
+
+    def __init__(self, offset, text, appended_at=None):
+        self.offset = offset
+        self.text = text
+        self.appended_at = time.time() if appended_at is None else appended_at
+        self._record = _UNDECODED
+
+    def __repr__(self):
+        return f"LogLine({self.offset}, {self.text!r})"
+
+    @property
+    def record(self):
+        """The decoded JSON object, or None if the line is not an NDJSON record."""
+        record = self._record
+        if record is _UNDECODED:
+            record = self._record = decode_record(self.text)
+        elif record is _UNCACHED:
+            record = decode_record(self.text)
+        return record
+
+log_hidden_ranges = {} # path -> ((st_dev, st_ino), start, end) of bytes left by earlier runs
+
+def hide_log_range(path, start=0):
+    """
+    Hides what earlier runs appended to a log this run reuses (a warm
+    simulant's opensim.log): bytes from `start` to the current end are skipped
+    by tails, cursors and Contains scanners, as long as it is the same file.
+    """
+    path = os.path.abspath(path)
+    try:
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            # A line still being written belongs to this run: hide complete lines only
+            tail = max(start, st.st_size - LOG_TAIL_CHUNK)
+            f.seek(tail)
+            end = tail + f.read(st.st_size - tail).rfind(b'\n') + 1
+    except OSError:
+        return
+    if end <= start:
+        end = st.st_size if tail > start else start
+    log_hidden_ranges[path] = ((st.st_dev, st.st_ino), min(start, st.st_size), end)
+
+def log_hidden_range(path, identity, size):
+    """The (start, end) byte range of the file hidden from this run ((0, 0) if none)."""
+    entry = log_hidden_ranges.get(os.path.abspath(path))
+    if entry and entry[0] == identity and entry[2] <= size:
+        return entry[1], entry[2]
+    return 0, 0
+
+def visible_spans(start, end, hidden):
+    """Splits the byte range [start, end) around the hidden range."""
+    lo, hi = hidden
+    spans = []
+    if start < min(end, lo):
+        spans.append((start, min(end, lo)))
+    if max(start, hi) < end:
+        spans.append((max(start, hi), end))
+    return spans
+
+class LogTail:
+    """
+    Shared incremental reader for one log file.
+    Each refresh reads only the bytes appended since the previous one, so every
+    byte is read from disk once no matter how many consumers watch the file.
+    Complete lines are retained (up to LOG_TAIL_HISTORY) for all LogCursors;
+    a trailing partial line stays buffered until its newline arrives.
+    Decoded records are kept only for the newest LOG_RECORD_CACHE lines, a
+    ring that is released as lines age out of it.
+    """
+    def __init__(self, path, history=LOG_TAIL_HISTORY):
+        self.path = path
+        self.history = history
+        self.lock = threading.Lock()
+        self.identity = None # (st_dev, st_ino) of the file being tailed
+        self.generation = 0 # bumped whenever the file is truncated or replaced
+        self.offset = 0 # bytes consumed from disk
+        self.partial = b''
+        self.starts = [] # byte offset of each retained line
+        self.lines = [] # LogLine for each retained line
+        self.record_floor = 0 # lines below this index have had their records released
+        self.appended_at = None # log modification time at the last read that found new bytes
+        self.hidden = (0, 0) # byte range earlier runs left in a reused log (see hide_log_range)
+
+    def _reset(self):
+        self.generation += 1
+        self.offset = 0
+        self.hidden = (0, 0)
+        self.partial = b''
+        self.starts = []
+        self.lines = []
+        self.record_floor = 0
+
+    def _absorb(self, data, appended_at):
+        base = self.offset - len(self.partial)
+        self.offset += len(data)
+        data = self.partial + data
+        end = data.rfind(b'\n') + 1
+        self.partial = data[end:]
+        if not end:
+            return
+        for raw in data[:end - 1].split(b'\n'):
+            self.starts.append(base)
+            self.lines.append(LogLine(base, raw.decode('utf-8', errors='replace'), appended_at))
+            base += len(raw) + 1
+
+        # Release decoded records that fell out of the record ring
+        floor = len(self.lines) - LOG_RECORD_CACHE
+        for line in self.lines[self.record_floor:max(self.record_floor, floor)]:
+            line._record = _UNCACHED
+        self.record_floor = max(self.record_floor, floor)
+
+        excess = len(self.lines) - self.history
+        if excess > self.history // 4:
+            del self.starts[:excess]
+            del self.lines[:excess]
+            self.record_floor = max(0, self.record_floor - excess)
+
+    def refresh(self):
+        """Reads newly appended bytes. Returns False if the file does not exist."""
+        with self.lock:
+            try:
+                f = open(self.path, 'rb')
+            except FileNotFoundError:
+                return False
+            with f:
+                st = os.fstat(f.fileno())
+                identity = (st.st_dev, st.st_ino)
+                if self.identity is None:
+                    self.hidden = log_hidden_range(self.path, identity, st.st_size)
+                elif identity != self.identity or st.st_size < self.offset:
+                    # Truncated or replaced: start over from the top
+                    self._reset()
+                self.identity = identity
+                if st.st_size > self.offset:
+                    f.seek(self.offset)
+                    self.appended_at = min(st.st_mtime, time.time())
+                    while True:
+                        lo, hi = self.hidden
+                        if lo <= self.offset < hi:
+                            self.partial = b'' # a line cut off by the hidden range
+                            self.offset = hi
+                            f.seek(hi)
+                        limit = lo - self.offset if self.offset < lo else LOG_TAIL_CHUNK
+                        data = f.read(min(LOG_TAIL_CHUNK, limit))
+                        if not data:
+                            break
+                        self._absorb(data, self.appended_at)
+            return True
+
+    def _read_range(self, start, end):
+        """Re-reads lines evicted from history (only for cursors far behind),
+        LOG_TAIL_CHUNK bytes at a time, skipping the hidden range."""
+        result = []
+        try:
+            with open(self.path, 'rb') as f:
+                appended_at = min(os.fstat(f.fileno()).st_mtime, time.time())
+                for start, end in visible_spans(start, end, self.hidden):
+                    f.seek(start)
+                    pending = b''
+                    remaining = end - start
+                    while remaining > 0:
+                        data = f.read(min(LOG_TAIL_CHUNK, remaining))
+                        if not data:
+                            break
+                        remaining -= len(data)
+                        data = pending + data
+                        cut = data.rfind(b'\n') + 1
+                        pending = data[cut:]
+                        if not cut:
+                            continue
+                        for raw in data[:cut - 1].split(b'\n'):
+                            result.append(LogLine(start, raw.decode('utf-8', errors='replace'), appended_at))
+                            start += len(raw) + 1
+        except OSError:
+            pass
+        return result
+
+    def read(self, cursor, include_partial=False):
+        """Returns the LogLines appended since the cursor's position and advances it."""
+        self.refresh()
+        with self.lock:
+            if cursor.generation != self.generation:
+                cursor.generation = self.generation
+                cursor.position = 0
+            lo, hi = self.hidden
+            if lo <= cursor.position < hi:
+                cursor.position = hi
+
+            complete = self.offset - len(self.partial)
+            first = self.starts[0] if self.starts else complete
+            result = []
+            if cursor.position < first:
+                result = self._read_range(cursor.position, first)
+
+            i = bisect.bisect_left(self.starts, cursor.position)
+            result.extend(self.lines[i:])
+            cursor.position = complete
+
+            if include_partial and self.partial:
+                result.append(LogLine(complete, self.partial.decode('utf-8', errors='replace'), self.appended_at))
+        return result
+
+class LogCursor:
+    """A single consumer's read position within a shared LogTail."""
+    def __init__(self, tail, position=0):
+        self.tail = tail
+        self.position = position
+        self.generation = tail.generation
+
+    def read(self, include_partial=False):
+        return self.tail.read(self, include_partial=include_partial)
+
+class ContainsScanner:
+    """
+    Streaming substring search for Contains: checks.
+    The raw bytes are searched through mmap (chunked reads where mmap is not
+    available), so the log is never materialized as a Python string. Each scan
+    resumes from the last scanned offset, backing up len(pattern) - 1 bytes so
+    matches spanning the previous end of file (or a chunk boundary) are found.
+    """
+    def __init__(self, path, pattern):
+        self.path = path
+        self.needle = pattern.encode('utf-8')
+        self.position = 0 # next offset at which a match may start
+        self.identity = None
+        self.hidden = (0, 0) # byte range earlier runs left in a reused log (see hide_log_range)
+
+    def _line_at(self, f, offset):
+        """Returns the LogLine containing offset (used for detection lag)."""
+        start = max(0, offset - 65536)
+        f.seek(start)
+        data = f.read(offset - start + 65536)
+        head = data.rfind(b'\n', 0, offset - start) + 1
+        tail = data.find(b'\n', offset - start)
+        raw = data[head:tail if tail >= 0 else len(data)]
+        appended_at = min(os.fstat(f.fileno()).st_mtime, time.time())
+        return LogLine(start + head, raw.decode('utf-8', errors='replace'), appended_at)
+
+    def _find_chunked(self, f, position, end):
+        overlap = len(self.needle) - 1
+        while position < end:
+            f.seek(position)
+            chunk = f.read(min(LOG_TAIL_CHUNK + overlap, end - position))
+            if not chunk:
+                break
+            found = chunk.find(self.needle)
+            if found >= 0:
+                return position + found
+            position += max(1, len(chunk) - overlap)
+        return -1
+
+    def scan(self):
+        """Returns the LogLine holding the first match since the last scan, or None."""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return None
+        with f:
+            st = os.fstat(f.fileno())
+            identity = (st.st_dev, st.st_ino)
+            if identity != self.identity or st.st_size < self.position:
+                # New, truncated or replaced: search from the top
+                self.position = 0
+                self.hidden = log_hidden_range(self.path, identity, st.st_size)
+            self.identity = identity
+            size = st.st_size
+            if not self.needle or size - self.position < len(self.needle):
+                return None
+
+            found = -1
+            spans = visible_spans(self.position, size, self.hidden)
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for start, end in spans:
+                        found = mm.find(self.needle, start, end)
+                        if found >= 0:
+                            break
+            except (ValueError, OSError):
+                for start, end in spans:
+                    found = self._find_chunked(f, start, end)
+                    if found >= 0:
+                        break
+
+            if found >= 0:
+                self.position = found + 1
+                return self._line_at(f, found)
+            self.position = size - len(self.needle) + 1
+        return None
+
+log_tails = {} # path -> LogTail
+log_tails_lock = threading.Lock()
+
+def open_log_cursor(path):
+    """Returns a new cursor (positioned at the start) on the shared tail for path."""
+    path = os.path.abspath(path)
+    with log_tails_lock:
+        tail = log_tails.get(path)
+        if tail is None:
+            tail = log_tails[path] = LogTail(path)
+    return LogCursor(tail)
+
+# --- Log Watching ---
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+class PollingWatcher:
+    """Fallback log watcher: waiting simply sleeps for the caller's poll interval."""
+    name = "polling"
+
+    def snapshot(self, paths):
+        return {path: 0 for path in paths}
+
+    def wait(self, snapshot, timeout, interval, stop_event=None):
+        delay = max(0, min(timeout, interval))
+        if stop_event:
+            stop_event.wait(delay)
+        else:
+            time.sleep(delay)
+
+    def interrupt(self):
+        pass
+
+class InotifyWatcher:
+    """
+    Event-driven log watcher (Linux inotify via ctypes).
+    Watches the parent directory of each log so that waiters wake as soon as
+    the file is appended, created, truncated or replaced.
+    """
+    name = "inotify"
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.cond = threading.Condition()
+        self.dirs = {} # real directory path -> watch descriptor (None if it could not be watched)
+        self.wds = {} # watch descriptor -> real directory path
+        self.versions = {} # real path -> change counter
+        self.alive = True # False once the reader thread has stopped
+        self.reader = threading.Thread(target=self._read_events, name="inotify", daemon=True)
+        self.reader.start()
+
+    def _watch_dir(self, directory):
+        if directory in self.dirs and self.dirs[directory] is not None:
+            return True
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            self.dirs[directory] = None # not there yet; retried on the next snapshot
+            return False
+        self.dirs[directory] = wd
+        self.wds[wd] = directory
+        return True
+
+    def snapshot(self, paths):
+        """
+        Returns the current change counter of each path (None if it cannot be watched).
+        Paths are resolved with realpath, so one directory reached through several
+        spellings (symlinks, '..') shares a single watch.
+        """
+        with self.cond:
+            snapshot = {}
+            for path in paths:
+                path = os.path.realpath(path)
+                if self._watch_dir(os.path.dirname(path)):
+                    # Registered even before its first event, so a queue overflow wakes it too
+                    snapshot[path] = self.versions.setdefault(path, 0)
+                else:
+                    snapshot[path] = None
+            return snapshot
+
+    def wait(self, snapshot, timeout, interval, stop_event=None):
+        """Blocks until any path changes after its snapshot, or timeout/stop."""
+        if not self.alive or any(version is None for version in snapshot.values()):
+            timeout = min(timeout, interval) # no events to wait for: degrade to polling
+        def changed():
+            if stop_event and stop_event.is_set():
+                return True
+            # Unwatchable paths (None) never signal a change: they are re-read after `interval`
+            return any(version is not None and self.versions.get(path, 0) != version
+                       for path, version in snapshot.items())
+        with self.cond:
+            self.cond.wait_for(changed, max(0, timeout))
+
+    def interrupt(self):
+        with self.cond:
+            self.cond.notify_all()
+
+    def _read_events(self):
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except InterruptedError:
+                continue
+            except OSError as e:
+                print(f"[DIRECTOR] inotify reader stopped: {e}; falling back to polling.")
+                with self.cond:
+                    self.alive = False
+                    self.cond.notify_all()
+                return
+            with self.cond:
+                pos = 0
+                while pos + INOTIFY_EVENT.size <= len(data):
+                    wd, mask, cookie, length = INOTIFY_EVENT.unpack_from(data, pos)
+                    name = data[pos + INOTIFY_EVENT.size:pos + INOTIFY_EVENT.size + length].rstrip(b'\0')
+                    pos += INOTIFY_EVENT.size + length
+                    if mask & IN_Q_OVERFLOW:
+                        # Events were dropped: treat every watched or snapshotted path as changed
+                        for path in self.versions:
+                            self.versions[path] += 1
+                        continue
+                    directory = self.wds.get(wd)
+                    if directory is None or not name:
+                        continue
+                    path = os.path.join(directory, os.fsdecode(name))
+                    self.versions[path] = self.versions.get(path, 0) + 1
+                self.cond.notify_all()
+
+log_watcher = None
+log_watcher_lock = threading.Lock()
+
+def get_log_watcher():
+    """Returns the process-wide log watcher (inotify on Linux, polling elsewhere)."""
+    global log_watcher
+    with log_watcher_lock:
+        if log_watcher is None:
+            backend = os.getenv("DIRECTOR_WATCHER", "inotify").lower()
+            if backend == "inotify" and platform.system() == "Linux":
+                try:
+                    log_watcher = InotifyWatcher()
+                except (OSError, AttributeError) as e:
+                    print(f"[DIRECTOR] inotify unavailable ({e}); falling back to polling.")
+            if log_watcher is None:
+                log_watcher = PollingWatcher()
+            director_emit(sys='DEBUG', sig='WATCHER', val=log_watcher.name)
+        return log_watcher
+
 # --- Sensors ---
 
-class Sensor(threading.Thread):
+class Sensor:
+    """An async-sensor registration; matching is driven by the SensorHub for its file."""
     def __init__(self, title, subject, filepath, pattern, action, payload, query=None):
-        super().__init__()
         self.title = title
         self.subject = subject
         self.filepath = filepath
@@ -519,74 +2017,21 @@ class Sensor(threading.Thread):
         self.query = query
         self.action = action # 'abort' or 'log'
         self.payload = payload
-        self.daemon = True
         self.running = True
-        self._stop_event = threading.Event()
 
     def stop(self):
         self.running = False
-        self._stop_event.set()
-
-    def run(self):
-        print(f"[DIRECTOR] Sensor '{self.title}' started on {self.subject}...")
-
-        # Wait for file to appear
-        while self.running and not os.path.exists(self.filepath):
-            if self._stop_event.wait(1.0):
-                return
-
-        if not self.running:
-            return
-
-        try:
-            # Open file and tail
-            with open(self.filepath, 'r') as f:
-                # Seek to end initially? Or read from start?
-                # Requirement: "if this descriptor block matches at any time during filming"
-                # If we start sensor late, we might miss early logs.
-                # But usually sensors are defined at top.
-                # Let's read from current position (which is start if just opened).
-                # But if we read whole file every time, it's slow.
-                # `tail -f` behavior: read up to end, then wait.
-
-                # Check existing content first?
-                # "if this descriptor block matches at any time" implies we should scan existing content too.
-                # But if file is huge?
-                # Let's assume we scan everything.
-
-                while self.running:
-                    line = f.readline()
-                    if line:
-                        triggered = False
-                        if self.query:
-                            if evaluate_query(self.query, line):
-                                triggered = True
-                        elif self.pattern:
-                            if self.pattern in line:
-                                triggered = True
-
-                        if triggered:
-                            self.trigger(line)
-                            if self.action == 'abort':
-                                break # Stop sensor after abort trigger
-                    else:
-                        if self._stop_event.wait(0.5):
-                            break
-                        # Reset file reading? No, readline handles it if file grows.
-                        # But we need to clear EOF state? Python file object usually handles this.
-                        # Just loop.
-                        pass
-        except Exception as e:
-            print(f"[DIRECTOR] Sensor '{self.title}' error: {e}")
 
     def trigger(self, line):
-        trigger_desc = f"Query '{self.query}'" if self.query else f"Pattern '{self.pattern}'"
+        detection = measure_detection(line)
+        line = line.text
+        trigger_desc = f"Query '{self.query.source}'" if self.query else f"Pattern '{self.pattern}'"
         print(f"[DIRECTOR] Sensor '{self.title}' TRIGGERED by {trigger_desc}")
-        director_emit(sys='DEBUG', sig='SENSOR', val=dict(title=self.title, desc=trigger_desc, line=line, action=self.action, payload=self.payload))
+        director_emit(sys='DEBUG', sig='SENSOR', val=dict(title=self.title, desc=trigger_desc, line=line, action=self.action, payload=self.payload, detection=detection))
 
         if self.action == 'abort':
             print(f"[DIRECTOR] SENSOR ABORT: {self.payload}")
-            log_observation(self.title, self.subject, False, f"ABORT TRIGGERED: {self.payload} ({trigger_desc})", "Sensor")
+            log_observation(self.title, self.subject, False, f"ABORT TRIGGERED: {self.payload} ({trigger_desc})", "Sensor", detection=detection)
 
             # Trigger graceful shutdown via signal
             os.kill(os.getpid(), signal.SIGINT)
@@ -603,19 +2048,127 @@ class Sensor(threading.Thread):
                 pass
 
             print(f"[DIRECTOR] SENSOR LOG: {details}")
-            log_observation(self.title, self.subject, True, f"SENSOR LOG: {details} ({trigger_desc})", "Sensor")
+            log_observation(self.title, self.subject, True, f"SENSOR LOG: {details} ({trigger_desc})", "Sensor", detection=detection)
 
         elif self.action == 'alert':
             print(f"[DIRECTOR] SENSOR ALERT: {self.payload}")
             # Send alert to console
             if opensim_console_interface:
                 time.sleep(.1)
-                opensim_console_interface.send(f"alert {self.payload}")
+                # Queued, not awaited: the hub keeps reading while it runs
+                opensim_console_interface.submit(f"alert {self.payload}")
             else:
                 print(f"[DIRECTOR] CRITICAL ERROR: Async Sensor triggered ALERT but OpenSim Console is NOT connected. Alert lost: {self.payload}")
 
-            log_observation(self.title, self.subject, True, f"SENSOR ALERT: {self.payload} ({trigger_desc})", "Sensor")
+            log_observation(self.title, self.subject, True, f"SENSOR ALERT: {self.payload} ({trigger_desc})", "Sensor", detection=detection)
 
+SENSOR_POLL_INTERVAL = 0.5 # seconds between reads when the watcher delivers no change events
+SENSOR_IDLE_WAKE = 60.0 # seconds; safety wake for an idle hub whose log is watched by inotify
+
+class SensorHub(threading.Thread):
+    """
+    Runs every async sensor watching one log file from a single reader.
+    Each appended line is matched against all registered sensors in one pass:
+    a combined alternation of all Contains: patterns rejects unrelated lines
+    before any per-sensor check, and queries use their own pre-filters.
+    Registering a sensor adds no reader; sensors registered after the hub has
+    started are caught up on earlier lines from the shared tail.
+    """
+    def __init__(self, filepath):
+        super().__init__(name=f"SensorHub:{os.path.basename(filepath)}", daemon=True)
+        self.path = os.path.abspath(filepath)
+        self.cursor = open_log_cursor(self.path)
+        self.lock = threading.Lock()
+        self.pending = []
+        self.sensors = []
+        self.contains_regex = None
+        self.running = True
+        self._wake = threading.Event()
+
+    def register(self, sensor):
+        with self.lock:
+            self.pending.append(sensor)
+        self.wake()
+
+    def stop(self):
+        self.running = False
+        self.wake()
+
+    def wake(self):
+        self._wake.set()
+        get_log_watcher().interrupt()
+
+    def _rebuild(self):
+        self.sensors = [sensor for sensor in self.sensors if sensor.running]
+        patterns = sorted({sensor.pattern for sensor in self.sensors if sensor.pattern and not sensor.query}, key=len, reverse=True)
+        self.contains_regex = re.compile("|".join(map(re.escape, patterns))) if patterns else None
+
+    def _admit_pending(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+        if not pending:
+            return
+        # Catch late sensors up on lines this hub has already dispatched
+        if self.cursor.position > 0:
+            catchup = LogCursor(self.cursor.tail)
+            for line in catchup.read():
+                if line.offset >= self.cursor.position:
+                    break
+                for sensor in pending:
+                    self._check(sensor, line, line.text)
+        self.sensors.extend(pending)
+        self._rebuild()
+
+    def _check(self, sensor, line, text, contains_hit=True):
+        if not sensor.running:
+            return
+        try:
+            if sensor.query:
+                triggered = evaluate_query(sensor.query, line)
+            else:
+                triggered = contains_hit and sensor.pattern in text
+            if triggered:
+                sensor.trigger(line)
+                if sensor.action == 'abort':
+                    sensor.stop() # Stop sensor after abort trigger
+        except Exception as e:
+            print(f"[DIRECTOR] Sensor '{sensor.title}' error: {e}")
+
+    def _dispatch(self, line):
+        text = line.text
+        contains_hit = self.contains_regex is not None and self.contains_regex.search(text) is not None
+        for sensor in self.sensors:
+            self._check(sensor, line, text, contains_hit)
+
+    def run(self):
+        watcher = get_log_watcher()
+        while self.running:
+            self._wake.clear()
+            snapshot = watcher.snapshot([self.path])
+            self._admit_pending()
+            lines = self.cursor.read()
+            for line in lines:
+                self._dispatch(line)
+            if any(not sensor.running for sensor in self.sensors):
+                self._rebuild()
+            if not lines:
+                # Sleep until the log changes or a sensor registers; without change
+                # events (polling watcher, unwatchable directory) only the polling interval
+                watcher.wait(snapshot, SENSOR_IDLE_WAKE, SENSOR_POLL_INTERVAL, stop_event=self._wake)
+
+sensor_hubs = {} # path -> SensorHub
+
+def register_sensor(sensor):
+    """Attaches a sensor to the hub for its file, starting the hub on first use."""
+    path = os.path.abspath(sensor.filepath)
+    hub = sensor_hubs.get(path)
+    if hub is None or not hub.is_alive():
+        hub = sensor_hubs[path] = SensorHub(path)
+        hub.register(sensor)
+        hub.start()
+    else:
+        hub.register(sensor)
+    print(f"[DIRECTOR] Sensor '{sensor.title}' started on {sensor.subject}...")
 
 # --- Block Handlers ---
 
@@ -648,6 +2201,13 @@ def run_async_sensor(content):
         print("[DIRECTOR] Error: Invalid Async Sensor configuration. Requires Subject, Contains (or Query), and director#abort/log/alert.")
         return # Or raise Error?
 
+    if query:
+        try:
+            query = compile_query(query)
+        except QueryError as e:
+            print(f"[DIRECTOR] Error: Async Sensor '{title}' has an invalid Query: {e}")
+            return
+
     filepath = resolve_log_source(config)
     if not filepath:
         print(f"[DIRECTOR] Error: Could not resolve file for subject '{subject}'")
@@ -658,7 +2218,7 @@ def run_async_sensor(content):
 
     sensor = Sensor(title, subject, filepath, pattern, action, payload, query=query)
     active_sensors.append(sensor)
-    sensor.start()
+    register_sensor(sensor)
 
 
 def run_bash_export(content):
@@ -675,7 +2235,7 @@ def run_bash_export(content):
         # Run and capture output
         result = subprocess.run(
             [BASH, "-c", wrapper],
-            env=ENV,
+            env=dotnet_env(),
             cwd=REPO_ROOT,
             check=True,
             capture_output=True,
@@ -710,34 +2270,80 @@ def run_bash(content):
     """Executes a bash script block."""
     print(f"[DIRECTOR] Executing BASH block...")
     try:
-        subprocess.run([BASH, "-c", content], env=ENV, cwd=REPO_ROOT, check=True)
+        subprocess.run([BASH, "-c", content], env=dotnet_env(), cwd=REPO_ROOT, check=True)
     except subprocess.CalledProcessError as e:
         print(f"Error in BASH block: {e}")
         raise DirectorError("Bash block execution failed")
 
-def inject_sql(db_path, sql_script):
-    """Injects SQL script into DB, statement by statement, ignoring errors."""
+INSERT_TARGET = re.compile(r'^\s*(?:INSERT|REPLACE)\s+(?:OR\s+\w+\s+)?INTO\s+["`\[]?(\w+)', re.IGNORECASE)
+
+# Seeding-time settings: the data is regenerated if a run dies mid-seed
+SEED_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA cache_size=-65536",
+)
+
+def inject_sql_bulk(db_path, sql_script):
+    """Injects SQL script into DB in a single transaction. Statements (one per
+    line) aimed at tables the DB does not have (not migrated yet) are skipped;
+    the rest run as one script, falling back to statement by statement
+    (ignoring errors) if the script fails. Returns the number of rows written."""
     if not os.path.exists(db_path):
         print(f"ERROR: DB {db_path} not found. CRITICAL FAILURE.")
         raise DirectorError(f"Database {db_path} not found")
 
+    start_time = time.time()
+    name = os.path.basename(db_path)
     try:
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            lines = sql_script.strip().split('\n')
-            for line in lines:
-                line = line.strip()
-                if not line: continue
+        conn = sqlite3.connect(db_path, isolation_level=None)
+    except sqlite3.Error as e:
+        print(f"Warning: Connection Error to {db_path}: {e}")
+        return 0
+
+    try:
+        for pragma in SEED_PRAGMAS:
+            conn.execute(pragma)
+        tables = {row[0].lower() for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+        statements = []
+        for line in sql_script.strip().split('\n'):
+            line = line.strip()
+            if not line: continue
+            target = INSERT_TARGET.match(line)
+            if target and target.group(1).lower() not in tables:
+                continue # no such table
+            statements.append(line if line.endswith(';') else line + ';')
+        if not statements:
+            return 0
+
+        before = conn.total_changes
+        try:
+            conn.executescript("BEGIN;\n" + "\n".join(statements) + "\nCOMMIT;")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"Warning: Bulk SQL failed in {name} ({e}); retrying statement by statement.")
+            before = conn.total_changes
+            conn.execute("BEGIN")
+            for statement in statements:
                 try:
-                    cursor.execute(line)
+                    conn.execute(statement)
                 except sqlite3.Error as e:
-                    if "no such table" in str(e):
-                        pass
-                    else:
-                        print(f"Warning: SQL Error in {os.path.basename(db_path)}: {e}")
-            conn.commit()
+                    if "no such table" not in str(e):
+                        print(f"Warning: SQL Error in {name}: {e}")
+            conn.execute("COMMIT")
+        rows = conn.total_changes - before
     except sqlite3.Error as e:
         print(f"Warning: Connection Error to {db_path}: {e}")
+        return 0
+    finally:
+        conn.close()
+
+    elapsed = max(time.time() - start_time, 1e-6)
+    print(f"  -> {name}: {rows} rows in {int(elapsed * 1000)}ms ({int(rows / elapsed)} rows/s)")
+    director_emit(sys='METRICS', sig='SQL_INJECT', val=dict(db=name, rows=rows, ms=int(elapsed * 1000)))
+    return rows
 
 def run_legacy_cast(content):
     """Parses JSON content to inject users via Sequencer."""
@@ -752,6 +2358,7 @@ def run_legacy_cast(content):
             os.path.join(OBSERVATORY_DIR, "auth.db")
         ]
 
+        roster = []
         for actor in cast_list:
             first = actor.get("First", "Test")
             last = actor.get("Last", "User")
@@ -763,20 +2370,27 @@ def run_legacy_cast(content):
             ACTORS[full_name] = actor # Store full actor config
 
             print(f"  -> Casting {first} {last} ({uuid}) as {species}")
+            roster.append({"First": first, "Last": last, "Password": password, "UUID": uuid})
 
-            # Generate User SQL
-            cmd_user = [
+        # Generate User SQL for the whole cast with one Sequencer launch
+        try:
+            sql_users = subprocess.check_output(
+                ["dotnet", SEQUENCER_DLL, "gen-users"],
+                input=json.dumps(roster).encode(), env=dotnet_env(), cwd=VIVARIUM_DIR).decode()
+        except subprocess.CalledProcessError:
+            # Sequencer builds predating gen-users: one launch per actor
+            print("[DIRECTOR] Sequencer gen-users unavailable; generating users one by one.")
+            sql_users = "".join(subprocess.check_output([
                 "dotnet", SEQUENCER_DLL, "gen-user",
-                "--first", first,
-                "--last", last,
-                "--pass", password,
-                "--uuid", uuid
-            ]
-            sql_user = subprocess.check_output(cmd_user, env=ENV, cwd=VIVARIUM_DIR).decode()
+                "--first", entry["First"],
+                "--last", entry["Last"],
+                "--pass", entry["Password"],
+                "--uuid", entry["UUID"]
+            ], env=dotnet_env(), cwd=VIVARIUM_DIR).decode() for entry in roster)
 
-            # Broadcast to all DBs
-            for db in dbs:
-                inject_sql(db, sql_user)
+        # Broadcast to all DBs
+        for db in dbs:
+            inject_sql_bulk(db, sql_users)
 
     except json.JSONDecodeError as e:
         print(f"Invalid JSON in CAST block: {e}")
@@ -785,25 +2399,236 @@ def run_legacy_cast(content):
         print(f"Error in CAST block: {e}")
         raise DirectorError("CAST block execution failed")
 
+def read_ini_value(path, key):
+    """Returns the first `key = value` in an ini file (None if absent)."""
+    try:
+        with open(path) as f:
+            match = re.search(rf'^\s*{re.escape(key)}\s*=\s*"?([^"\n]*?)"?\s*$', f.read(), re.MULTILINE)
+            return match.group(1) if match else None
+    except OSError:
+        return None
+
+def run_seed_prims(content):
+    """Seeds the region database with generated prims (Sequencer gen-prims)
+    in one bulk injection. Meant to run before OpenSim boots: a running
+    simulator only loads the new prims on its next start."""
+    config = parse_kv_block(content)
+    count = int(config.get('count', '1000'))
+    layout = config.get('layout', 'grid').lower()
+    region = config.get('region') or read_ini_value(os.path.join(OBSERVATORY_DIR, "Regions", "Regions.ini"), "RegionUUID")
+    owner = config.get('owner') or read_ini_value(os.path.join(OBSERVATORY_DIR, "encounter.ini"), "DefaultEstateOwnerUUID")
+    center = config.get('center', '128,128').split(',')
+    db_path = os.path.join(OBSERVATORY_DIR, config.get('database', 'OpenSim.db'))
+
+    if not region or not owner:
+        raise DirectorError("seed-prims needs a Region and an Owner (none found in Regions.ini / encounter.ini)")
+    if layout not in ("grid", "spiral", "random"):
+        raise DirectorError(f"seed-prims: unknown Layout '{layout}' (expected grid, spiral or random)")
+
+    print(f"[DIRECTOR] Seeding {count} prims ({layout}) into region {region}...")
+    if (opensim_proc is not None and opensim_proc.poll() is None) or ENV.get("TERRITORY_WARM"):
+        print("[DIRECTOR] Warning: OpenSim is running; seeded prims appear after its next start.")
+
+    start_time = time.time()
+    cmd = [
+        "dotnet", SEQUENCER_DLL, "gen-prims",
+        "--owner", owner,
+        "--region", region,
+        "--count", str(count),
+        "--layout", layout,
+        "--seed", config.get('seed', '0'),
+        "--centerX", center[0].strip(),
+        "--centerY", center[-1].strip(),
+        "--posZ", config.get('height', '25'),
+        "--spacing", config.get('spacing', '2')
+    ]
+    try:
+        sql_prims = subprocess.check_output(cmd, env=dotnet_env(), cwd=VIVARIUM_DIR).decode()
+    except subprocess.CalledProcessError as e:
+        raise DirectorError(f"Sequencer gen-prims failed (exit {e.returncode})")
+
+    rows = inject_sql_bulk(db_path, sql_prims)
+    if rows == 0:
+        print(f"[DIRECTOR] Warning: no new prims written to {db_path} (already seeded, or OpenSim has not created its tables yet)")
+    director_emit(sys='DEBUG', sig='SEED_PRIMS', val=dict(count=count, layout=layout, region=region, rows=rows, ms=int((time.time() - start_time) * 1000)))
+
+CAST_VERIFY_CHUNK = 400 # name pairs per query (2 bound variables each)
+USER_DB_RECHECK = 0.25 # seconds; upper bound between data_version checks
+
+def find_existing_users(conn, names):
+    """Returns the subset of (first, last) pairs present in UserAccounts."""
+    names = list(names)
+    found = set()
+    for i in range(0, len(names), CAST_VERIFY_CHUNK):
+        chunk = names[i:i + CAST_VERIFY_CHUNK]
+        values = ",".join(["(?,?)"] * len(chunk))
+        rows = conn.execute(
+            f"SELECT FirstName, LastName FROM UserAccounts WHERE (FirstName, LastName) IN (VALUES {values})",
+            [part for name in chunk for part in name])
+        found.update(rows)
+    return found
+
+class UserAccountWatcher:
+    """
+    Long-lived read-only view of userprofiles.db. `PRAGMA data_version`
+    tells when another connection (OpenSim) has committed, so UserAccounts is
+    only re-queried after a change; waiters are woken by the log watcher
+    (inotify on the database and its journal/WAL) as soon as a commit lands.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.paths = [db_path, db_path + "-journal", db_path + "-wal"]
+        self.lock = threading.Lock()
+        self.conn = None
+        self.inode = None
+        self.data_version = None
+
+    def _connect(self):
+        try:
+            inode = os.stat(self.db_path).st_ino
+        except OSError:
+            self._disconnect()
+            return None
+        if self.conn is not None and inode != self.inode:
+            self._disconnect() # replaced (e.g. snapshot restore)
+        if self.conn is None:
+            try:
+                # Use read-only mode to avoid locking
+                self.conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            except sqlite3.Error:
+                return None
+            self.inode = inode
+            self.data_version = None
+        return self.conn
+
+    def _changed(self):
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = version != self.data_version
+        self.data_version = version
+        return changed
+
+    def find(self, names, only_if_changed=False):
+        """Returns the subset of (first, last) pairs present in UserAccounts
+        (None if `only_if_changed` and nothing was committed since the last
+        check)."""
+        with self.lock:
+            try:
+                if not self._connect():
+                    return set()
+                if not self._changed() and only_if_changed:
+                    return None
+                return find_existing_users(self.conn, names)
+            except sqlite3.Error:
+                return set() # table not migrated yet
+
+    def wait_for(self, names, timeout, on_found=None):
+        """Blocks until every (first, last) pair exists or timeout. Calls
+        on_found(name) as each appears; returns the names still missing."""
+        pending = set(names)
+        watcher = get_log_watcher()
+        deadline = time.time() + timeout
+        only_if_changed = False
+        while pending:
+            snapshot = watcher.snapshot(self.paths) # before querying: no lost wakeups
+            found = self.find(pending, only_if_changed)
+            only_if_changed = True
+            for name in found or ():
+                pending.discard(name)
+                if on_found:
+                    on_found(name)
+            remaining = deadline - time.time()
+            if not pending or remaining <= 0:
+                break
+            watcher.wait(snapshot, min(remaining, USER_DB_RECHECK), USER_DB_RECHECK)
+        return pending
+
+    def _disconnect(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def close(self):
+        with self.lock:
+            self._disconnect()
+
+user_account_watcher = None
+
+def get_user_account_watcher():
+    """Returns the process-wide watcher on the observatory's userprofiles.db."""
+    global user_account_watcher
+    if user_account_watcher is None:
+        user_account_watcher = UserAccountWatcher(os.path.join(OBSERVATORY_DIR, "userprofiles.db"))
+    return user_account_watcher
+
 def check_user_exists(first, last):
     """Checks if a user exists in the userprofiles.db."""
-    db_path = os.path.join(OBSERVATORY_DIR, "userprofiles.db")
-    if not os.path.exists(db_path):
-        return False
-    try:
-         # Use read-only mode if possible to avoid locking
-         uri = f"file:{db_path}?mode=ro"
-         with sqlite3.connect(uri, uri=True) as conn:
-             cursor = conn.cursor()
-             cursor.execute("SELECT PrincipalID FROM UserAccounts WHERE FirstName=? AND LastName=?", (first, last))
-             return cursor.fetchone() is not None
-    except Exception as e:
-         # print(f"DB Check Error: {e}")
-         return False
+    return (first, last) in get_user_account_watcher().find([(first, last)])
+
+def log_cast_skip(first, last):
+    """Reports an actor the cast did not create because its account already exists
+    (e.g. restored from a snapshot)."""
+    print(f"  -> {first} {last} already exists in DB (skipped).")
+    log_observation(f"Cast {first} {last}", "CAST", True, "account already exists", "Cast", skipped=True)
+
+def run_cast_bulk(actors):
+    """Creates every actor's account in one go: all `create user` commands are
+    sent as one console batch, with a timeout scaled to the cast size, while
+    the whole cast is verified by one query per database commit on the shared
+    read-only connection. Reports per-actor creation latency."""
+    names = [(actor.get("First", "Test"), actor.get("Last", "User")) for actor in actors]
+    duplicates = sorted(name for name, count in collections.Counter(names).items() if count > 1)
+    if duplicates:
+        raise DirectorError("Duplicate actors in cast: " + ", ".join(f"{first} {last}" for first, last in duplicates))
+
+    pending = {}
+    for actor in actors:
+        first = actor.get("First", "Test")
+        last = actor.get("Last", "User")
+        password = actor.get("Password", "secret")
+        uuid = actor.get("UUID", "00000000-0000-0000-0000-000000000000")
+        email = actor.get("Email", "test@example.com")
+        model = actor.get("Model", "default")
+        print(f"  -> Casting {first} {last} ({uuid}) as {actor.get('Species', 'Mimic').lower()}")
+        pending[(first, last)] = f"create user {first} {last} {password} {email} {uuid} {model}"
+
+    users = get_user_account_watcher()
+    for name in users.find(pending):
+        log_cast_skip(*name)
+        del pending[name]
+    if not pending:
+        return
+
+    start_time = time.time()
+    timeout = 10 + 0.1 * len(pending)
+    futures = opensim_console_interface.submit_batch(pending.values(), timeout=timeout)
 
-def run_cast(content):
+    print(f"  -> Verifying creation of {len(pending)} actors...")
+    latencies = {}
+
+    def verified(name):
+        latencies[name] = int((time.time() - start_time) * 1000)
+        print(f"  -> Verified: {name[0]} {name[1]} exists in DB ({latencies[name]}ms).")
+
+    pending = users.wait_for(pending, timeout, on_found=verified)
+
+    for future in futures:
+        future.result() # surfaces console errors
+
+    if latencies:
+        values = sorted(latencies.values())
+        print(f"[DIRECTOR] Cast {len(values)} actors in {int((time.time() - start_time) * 1000)}ms "
+              f"(latency p50 {percentile(values, 50)}ms, max {values[-1]}ms)")
+        director_emit(sys='METRICS', sig='CAST_LATENCY', val={f"{first} {last}": ms for (first, last), ms in latencies.items()})
+
+    if pending:
+        missing = ", ".join(f"{first} {last}" for first, last in pending)
+        print(f"  -> Warning: verification timed out for {missing}. They might still be created later.")
+        raise DirectorError(f"Failed to verify user creation for {missing}")
+
+def run_cast(content, bulk=False):
     """Parses JSON content to create users via OpenSim Console."""
-    print(f"[DIRECTOR] Executing CAST block (create user strategy)...")
+    print(f"[DIRECTOR] Executing CAST block (create user strategy{', bulk' if bulk else ''})...")
 
     try:
         cast_list = json.loads(content)
@@ -818,6 +2643,20 @@ def run_cast(content):
              print("[DIRECTOR] Error: OpenSim must be running to execute CAST block (create user strategy).")
              raise DirectorError("OpenSim not running for CAST block")
 
+        if bulk:
+            actors = []
+            for actor in cast_list:
+                full_name = f"{actor.get('First', 'Test')} {actor.get('Last', 'User')}"
+                ACTORS[full_name] = actor # Store full actor config
+                species = actor.get("Species", "Mimic").lower()
+                if species in ["opensim", "territory", "simulant"]:
+                    print(f"  -> Configured {species} (Transient={actor.get('Transient')})")
+                else:
+                    actors.append(actor)
+            if actors:
+                run_cast_bulk(actors)
+            return
+
         for actor in cast_list:
             first = actor.get("First", "Test")
             last = actor.get("Last", "User")
@@ -834,23 +2673,21 @@ def run_cast(content):
                 print(f"  -> Configured {species} (Transient={actor.get('Transient')})")
                 continue
 
+            if check_user_exists(first, last):
+                log_cast_skip(first, last)
+                continue
+
             print(f"  -> Casting {first} {last} ({uuid}) as {species}")
 
             # Command: create user <first> <last> <pass> <email> <uuid> <model>
             command = f"create user {first} {last} {password} {email} {uuid} {model}"
             opensim_console_interface.send(command)
 
-            # Verification loop
+            # Verification: wakes on the commit that adds the account
             print(f"  -> Verifying creation of {first} {last}...")
-            time.sleep(0.25)
-            start_time = time.time()
-            found = False
-            while time.time() - start_time < 10: # 10s timeout
-                if check_user_exists(first, last):
-                    found = True
-                    print(f"  -> Verified: {first} {last} exists in DB.")
-                    break
-                time.sleep(0.25)
+            found = not get_user_account_watcher().wait_for([(first, last)], 10) # 10s timeout
+            if found:
+                print(f"  -> Verified: {first} {last} exists in DB.")
 
             if not found:
                  print(f"  -> Warning: verification timed out for {first} {last}. It might still be created later.")
@@ -863,8 +2700,9 @@ def run_cast(content):
         print(f"Error in CAST block: {e}")
         raise DirectorError("CAST block execution failed")
 
-def run_opensim(content):
-    """Manages OpenSim process."""
+def run_opensim(content, batch=False):
+    """Manages OpenSim process. With `batch`, consecutive console commands are
+    sent as one pipelined batch (flushed at each special line)."""
     global opensim_proc
     global opensim_console_interface
 
@@ -935,13 +2773,20 @@ def run_opensim(content):
         # Configure the predictable Encounter Log path
         encounter_log = os.path.join(VIVARIUM_DIR, f"encounter.{SCENARIO_NAME}.territory.log")
 
-        proc_env = ENV.copy()
+        proc_env = dotnet_env().copy()
         proc_env["OPENSIM_ENCOUNTER_LOG"] = encounter_log
         proc_env["OPENSIM_CONSOLE"] = console_mode
         proc_env["TAG_UA"] = SIMULANT_CFG["tag_ua"]
         print("[cmd] ", " ".join(cmd), file=sys.stderr)
         print("[env.OBSERVATORY_DIR] ", proc_env['OBSERVATORY_DIR'], file=sys.stderr)
         print("[cwd] ", proc_env['OPENSIM_DIR'], file=sys.stderr)
+
+        if use_rest and use_warm_territory():
+            opensim_proc, opensim_console_interface = attach_warm_territory(cmd, proc_env, encounter_log)
+            print(f"[DIRECTOR] Encounter Log: {encounter_log} (relayed from {WARM_ENCOUNTER_LOG})")
+            run_territory_commands(content, batch)
+            return
+
         opensim_proc = subprocess.Popen(
             cmd,
             cwd=OPENSIM_DIR,
@@ -957,31 +2802,43 @@ def run_opensim(content):
 
         # Initialize Interface
         if use_rest:
-            opensim_console_interface = RestConsole(opensim_proc)
+            opensim_console_interface = ConsoleMux(make_rest_console(opensim_proc))
             # Preflight Certification: PID Check
-            print("[DIRECTOR] Preflight Certifying OpenSim Connection...")
-            resp = opensim_console_interface.send("env processid", timeout=10)
-            remote_pid = None
-            try:
-                remote_pid = int(resp["response"])
-            except:
-                print(f"[DIRECTOR] Warning: Could not parse processid from '{resp}'")
-            if remote_pid != opensim_proc.pid:
-                msg = f"PID Mismatch! Connected to OpenSim PID {remote_pid}, but expected PID {opensim_proc.pid}. " \
-                    f"This usually means a background OpenSim instance is blocking port 9000."
-                print(f"[DIRECTOR] CRITICAL ERROR: {msg}")
-                raise DirectorError(msg)
-            else:
-                print(f"[DIRECTOR] Preflight Success: Connected to PID {remote_pid}.")
+            certify_territory(opensim_console_interface, opensim_proc.pid)
         else:
-            opensim_console_interface = LocalConsole(opensim_proc)
+            opensim_console_interface = ConsoleMux(LocalConsole(opensim_proc))
+
+    run_territory_commands(content, batch)
+
+def run_territory_commands(content, batch=False):
+    """Sends a territory block's lines to the running OpenSim."""
+    global opensim_proc
+    global opensim_console_interface
+
+    command_timeout = None # seconds; None leaves it to the console
+    queued = []
+
+    def send_queued():
+        results = opensim_console_interface.send_batch(queued, timeout=command_timeout)
+        ok = sum(1 for r in results if r and r.get("status") == "OK")
+        print(f"[DIRECTOR] Batch of {len(queued)} commands: {ok} OK")
+        queued.clear()
 
     lines = content.strip().split('\n')
     for line in lines:
         line = line.strip()
         if not line: continue
 
-        if line.startswith("WAIT "):
+        special = line.startswith(("TIMEOUT ", "WAIT ")) or line in ("QUIT", "WAIT_FOR_EXIT")
+        if special and queued:
+            send_queued()
+
+        if line.startswith("TIMEOUT "):
+            try:
+                command_timeout = int(line.split()[1]) / 1000.0
+            except ValueError:
+                pass
+        elif line.startswith("WAIT "):
             try:
                 ms = int(line.split()[1])
                 time.sleep(ms / 1000.0)
@@ -1022,11 +2879,16 @@ def run_opensim(content):
         elif line.startswith("#"):
             pass # Ignore comments
         else:
-            if opensim_console_interface:
-                opensim_console_interface.send(line)
-            else:
+            if not opensim_console_interface:
                  print("[DIRECTOR] CRITICAL ERROR: Attempted to send command to OpenSim but interface is NOT initialized.")
                  raise DirectorError("OpenSim Console not initialized when command requested.")
+            if batch:
+                queued.append(line)
+            else:
+                opensim_console_interface.send(line, timeout=command_timeout)
+
+    if queued:
+        send_queued()
 
 mimic_sessions = {}
 
@@ -1063,7 +2925,7 @@ def get_mimic_session(name, strict=False):
 
     log_file = open(log_path, "w")
 
-    proc_env = ENV.copy()
+    proc_env = dotnet_env().copy()
     # Remove encounter log env var to avoid confusion, though stdout capture is main method
     if "MIMIC_ENCOUNTER_LOG" in proc_env:
         del proc_env["MIMIC_ENCOUNTER_LOG"]
@@ -1204,6 +3066,8 @@ def run_verify(content):
 
     print(f"[DIRECTOR] Verifying: {title} ({frame})")
 
+    compiled = compile_query(query) if query else None
+
     filepath = resolve_log_source(config)
     if not filepath:
         print("  -> Error: No 'File' or 'Subject' specified for verification.")
@@ -1217,110 +3081,314 @@ def run_verify(content):
 
     passed = False
     details = ""
+    detection = None
 
     if os.path.exists(full_path):
-        with open(full_path, 'r', errors='replace') as f:
-            if query:
-                # Line-by-line query evaluation
-                found = False
-                for line in f:
-                    if evaluate_query(query, line):
-                        found = True
-                        break
+        if query:
+            lines = open_log_cursor(full_path).read(include_partial=True)
+            # Line-by-line query evaluation
+            found = None
+            for line in lines:
+                if evaluate_query(compiled, line):
+                    found = line
+                    break
 
-                if found:
-                    passed = True
-                    details = f"Query matched in {os.path.basename(filepath)}"
-                    print(f"  -> PASSED: Query '{query}' matched.")
-                else:
-                    details = f"Query '{query}' NOT matched in {os.path.basename(filepath)}"
-                    print(f"  -> FAILED: {details}")
-
-            elif pattern:
-                # Basic string search
-                log_content = f.read()
-                if pattern in log_content:
-                    passed = True
-                    details = f"Found '{pattern}' in {os.path.basename(filepath)}"
-                    print(f"  -> PASSED: Found expected evidence.")
-                else:
-                    details = f"Pattern '{pattern}' NOT found in {os.path.basename(filepath)}"
-                    print(f"  -> FAILED: {details}")
+            if found:
+                detection = measure_detection(found)
+                passed = True
+                details = f"Query matched in {os.path.basename(filepath)}"
+                print(f"  -> PASSED: Query '{query}' matched.")
             else:
-                print("  -> Error: Neither 'Contains' nor 'Query' specified.")
-                raise DirectorError("Missing verification criteria")
+                details = f"Query '{query}' NOT matched in {os.path.basename(filepath)}"
+                print(f"  -> FAILED: {details}")
+
+        elif pattern:
+            # Streaming substring search (never loads the whole log)
+            found = ContainsScanner(full_path, pattern).scan()
+            if found:
+                detection = measure_detection(found)
+                passed = True
+                details = f"Found '{pattern}' in {os.path.basename(filepath)}"
+                print(f"  -> PASSED: Found expected evidence.")
+            else:
+                details = f"Pattern '{pattern}' NOT found in {os.path.basename(filepath)}"
+                print(f"  -> FAILED: {details}")
+        else:
+            print("  -> Error: Neither 'Contains' nor 'Query' specified.")
+            raise DirectorError("Missing verification criteria")
     else:
         details = f"File {filepath} does not exist."
         print(f"  -> FAILED: {details}")
 
-    log_observation(title, frame, passed, details, "State")
+    log_observation(title, frame, passed, details, "State", detection=detection)
 
     if not passed:
         raise DirectorError("Verification failed")
 
-def run_await(content):
-    """Parses and executes an AWAIT block (blocking verification)."""
-    config = parse_kv_block(content)
+class AwaitCondition:
+    """One await criterion (Subject/File plus Contains or Query), followed incrementally."""
+    def __init__(self, config):
+        self.title = config.get('title', 'Untitled Event')
+        self.pattern = config.get('contains')
+        self.query = config.get('query')
+        self.subject = config.get('subject')
+        self.frame = config.get('frame', 'General')
 
-    title = config.get('title', 'Untitled Event')
-    pattern = config.get('contains')
-    query = config.get('query')
-    frame = config.get('frame', 'General')
-    subject = config.get('subject')
-    timeout_ms = int(config.get('timeout', 30000))
+        # If frame is default, try to infer from subject
+        if self.frame == 'General' and self.subject:
+            self.frame = self.subject
 
-    # If frame is default, try to infer from subject
-    if frame == 'General' and subject:
-        frame = subject
+        self.compiled = compile_query(self.query) if self.query else None
 
-    print(f"[DIRECTOR] Awaiting: {title} ({frame}) [Timeout: {timeout_ms}ms] { resolve_log_source(config) if os.getenv('DIRECTOR_DEBUG') else ''}")
+        self.filepath = resolve_log_source(config)
+        if not self.filepath:
+            print("  -> Error: No 'File' or 'Subject' specified for await.")
+            raise DirectorError("No 'File' or 'Subject' specified for await")
 
-    filepath = resolve_log_source(config)
-    if not filepath:
-        print("  -> Error: No 'File' or 'Subject' specified for await.")
-        raise DirectorError("No 'File' or 'Subject' specified for await")
+        if not os.path.isabs(self.filepath):
+            self.full_path = os.path.join(REPO_ROOT, self.filepath)
+        else:
+            self.full_path = self.filepath
+        self.full_path = os.path.abspath(self.full_path)
 
-    if not os.path.isabs(filepath):
-        full_path = os.path.join(REPO_ROOT, filepath)
-    else:
-        full_path = filepath
+        if self.query:
+            self.cursor = open_log_cursor(self.full_path)
+        else:
+            self.scanner = ContainsScanner(self.full_path, self.pattern or '')
+        self.passed = False
+        self.details = ""
+        self.elapsed_ms = None
+        self.detection = None
+
+    def poll(self):
+        """Examines content appended since the last poll; returns True once matched."""
+        if not self.query:
+            line = self.scanner.scan()
+            if line is not None:
+                self.passed = True
+                self.details = f"Event observed: '{self.pattern}'"
+                self.detection = measure_detection(line)
+            return self.passed
+
+        for line in self.cursor.read(include_partial=True):
+            if evaluate_query(self.compiled, line):
+                self.passed = True
+                self.details = f"Event observed via query: '{self.query}'"
+                self.detection = measure_detection(line)
+                return True
+        return False
 
+    def fail(self):
+        criteria = f"Query '{self.query}'" if self.query else f"Pattern '{self.pattern}'"
+        self.details = f"Timeout waiting for {criteria} in {os.path.basename(self.filepath)}"
+        print(f"  -> FAILED: {self.details}")
+
+AWAIT_IDLE_WAKE = 1.0 # seconds; safety re-check of awaited logs watched by inotify
+
+def await_conditions(conditions, timeout_ms, mode='all'):
+    """
+    Waits for conditions under one shared deadline.
+    mode 'all' requires every condition, 'any' the first one. Returns True if satisfied.
+    """
     start_time = time.time()
-    passed = False
-    details = ""
+    watcher = get_log_watcher()
+    pending = list(conditions)
+    while True:
+        snapshot = watcher.snapshot([condition.full_path for condition in pending])
+        for condition in list(pending):
+            if condition.poll():
+                condition.elapsed_ms = int((time.time() - start_time) * 1000)
+                label = f"{condition.title}: " if len(conditions) > 1 else ""
+                print(f"  -> PASSED: {label}Event observed in {condition.elapsed_ms}ms.")
+                pending.remove(condition)
+
+        if not pending or (mode == 'any' and len(pending) < len(conditions)):
+            return True
 
-    # Poll loop
-    while (time.time() - start_time) * 1000 < timeout_ms:
-        if os.path.exists(full_path):
-            with open(full_path, 'r', errors='replace') as f:
-                if query:
-                    # Line-by-line query evaluation
-                    for line in f:
-                        if evaluate_query(query, line):
-                            passed = True
-                            details = f"Event observed via query: '{query}'"
-                            print(f"  -> PASSED: Event observed in {int((time.time() - start_time)*1000)}ms.")
-                            break
-                elif pattern:
-                    log_content = f.read()
-                    if pattern in log_content:
-                        passed = True
-                        details = f"Event observed: '{pattern}'"
-                        print(f"  -> PASSED: Event observed in {int((time.time() - start_time)*1000)}ms.")
-
-                if passed:
-                    break
-        time.sleep(0.1)
+        remaining = timeout_ms / 1000.0 - (time.time() - start_time)
+        if remaining <= 0:
+            return False
+        # Wake on the next change to any pending log (or after the polling interval),
+        # re-checking at least every AWAIT_IDLE_WAKE in case a change event was lost
+        watcher.wait(snapshot, min(remaining, AWAIT_IDLE_WAKE), 0.1)
+
+def run_await(content):
+    """Parses and executes an AWAIT block (blocking verification)."""
+    config = parse_kv_block(content)
+    timeout_ms = int(config.get('timeout', 30000))
+
+    condition = AwaitCondition(config)
+    print(f"[DIRECTOR] Awaiting: {condition.title} ({condition.frame}) [Timeout: {timeout_ms}ms] { condition.filepath if os.getenv('DIRECTOR_DEBUG') else ''}")
 
+    passed = await_conditions([condition], timeout_ms)
     if not passed:
-        criteria = f"Query '{query}'" if query else f"Pattern '{pattern}'"
-        details = f"Timeout waiting for {criteria} in {os.path.basename(filepath)}"
-        print(f"  -> FAILED: {details}")
+        condition.fail()
+
+    log_observation(condition.title, condition.frame, passed, condition.details, "Event", detection=condition.detection)
+
+    if not passed:
+        raise DirectorError(f"Await timeout: {condition.details}")
 
-    log_observation(title, frame, passed, details, "Event")
+def run_await_group(content, mode):
+    """
+    Parses and executes an AWAIT-ALL / AWAIT-ANY block: several conditions,
+    separated by '---' lines, awaited concurrently under one shared Timeout.
+    An optional leading section without Subject/File/Contains/Query holds
+    the group's Title and Timeout.
+    """
+    sections = [section for section in re.split(r'^\s*---\s*$', content, flags=re.MULTILINE) if section.strip()]
+    header = {}
+    if sections:
+        first = parse_kv_block(sections[0])
+        if not any(key in first for key in ('subject', 'file', 'contains', 'query')):
+            header = first
+            sections = sections[1:]
+
+    if not sections:
+        print(f"  -> Error: AWAIT-{mode.upper()} block has no conditions.")
+        raise DirectorError(f"AWAIT-{mode.upper()} block has no conditions")
+
+    title = header.get('title', f"Await {mode}")
+    timeout_ms = int(header.get('timeout', 30000))
+    configs = [parse_kv_block(section) for section in sections]
+    for config in configs:
+        if 'timeout' in config:
+            print(f"  -> Error: Timeout on condition '{config.get('title', 'Untitled Event')}' in AWAIT-{mode.upper()} block.")
+            raise DirectorError(f"AWAIT-{mode.upper()} conditions share the group Timeout: set it in the leading section "
+                                "(without Subject/File/Contains/Query), not per condition")
+    conditions = [AwaitCondition(config) for config in configs]
+
+    print(f"[DIRECTOR] Awaiting {mode} of {len(conditions)}: {title} [Timeout: {timeout_ms}ms]")
+    for condition in conditions:
+        print(f"  -> Condition: {condition.title} ({condition.frame})")
+
+    passed = await_conditions(conditions, timeout_ms, mode=mode)
+
+    for condition in conditions:
+        if condition.passed:
+            log_observation(condition.title, condition.frame, True, f"{condition.details} after {condition.elapsed_ms}ms", "Event", detection=condition.detection)
+        elif not passed:
+            condition.fail()
+            log_observation(condition.title, condition.frame, False, condition.details, "Event")
+        else:
+            # await-any: another condition already satisfied the group
+            print(f"  -> SKIPPED: {condition.title} (not needed)")
+            log_observation(condition.title, condition.frame, True, "not needed: another condition of the group was observed", "Event", skipped=True)
 
     if not passed:
-        raise DirectorError(f"Await timeout: {details}")
+        missing = [condition.title for condition in conditions if not condition.passed]
+        raise DirectorError(f"Await {mode} timeout: {title} (missing: {', '.join(missing)})")
+
+# --- Database Snapshots ---
+
+SNAPSHOT_DIR = os.getenv("DIRECTOR_SNAPSHOT_DIR", os.path.join(VIVARIUM_DIR, "snapshots"))
+FICLONE = 0x40049409 # linux/fs.h: _IOW(0x94, 9, int)
+snapshot_key_cache = None
+
+def digest_simulant_config(digest):
+    """Feeds the simulant's identity and ini files into a hashlib digest."""
+    digest.update(SIMULANT_FQN.encode())
+    ini_files = [SIMULANT_CFG["inifile"]] + sorted(
+        path for path in glob.glob(os.path.join(OBSERVATORY_DIR, "**", "*.ini"), recursive=True)
+        if os.path.basename(path) != "RestConsole.ini") # written by the Director itself
+    for path in ini_files:
+        digest.update(b"\0" + os.path.relpath(path, REPO_ROOT).encode() + b"\0")
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+
+def snapshot_key():
+    """Hash of everything the post-migration, post-cast databases depend on:
+    the simulant, its ini files and the scenario's cast blocks. Computed once
+    per run so `restore` and `save` agree."""
+    global snapshot_key_cache
+    if snapshot_key_cache:
+        return snapshot_key_cache
+    digest = hashlib.sha256()
+    digest_simulant_config(digest)
+    for match in re.finditer(r'^```(cast|legacy-cast|cast-legacy)\b[^\n]*\n(.*?)```', SCENARIO_TEXT, re.MULTILINE | re.DOTALL):
+        digest.update(b"\0" + match.group(1).encode() + b"\0" + match.group(2).encode())
+    snapshot_key_cache = digest.hexdigest()[:16]
+    return snapshot_key_cache
+
+def clone_file(src, dst):
+    """Copies src to dst, as a reflink (copy-on-write clone) when the
+    filesystem supports it."""
+    try:
+        import fcntl
+        with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+            fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+        shutil.copystat(src, dst)
+        return
+    except (ImportError, OSError):
+        pass
+    shutil.copy2(src, dst)
+
+def run_snapshot(action):
+    """`snapshot restore`: copies cached databases into the observatory dir.
+    `snapshot save`: caches the observatory databases (once per key)."""
+    if os.getenv("DIRECTOR_SNAPSHOTS", "1") == "0":
+        print("[DIRECTOR] Snapshots disabled (DIRECTOR_SNAPSHOTS=0).")
+        return
+    key = snapshot_key()
+    cache_dir = os.path.join(SNAPSHOT_DIR, f"{SIMULANT_FQN}-{key}")
+    start_time = time.time()
+
+    if action == "restore":
+        if not os.path.isdir(cache_dir):
+            print(f"[DIRECTOR] No database snapshot for key {key}; databases will be built from scratch.")
+            director_emit(sys='DEBUG', sig='SNAPSHOT', val=dict(action=action, key=key, hit=False))
+            return
+        if ENV.get("TERRITORY_WARM"):
+            print(f"[DIRECTOR] Warm territory is running on its own databases; snapshot {key} not restored.")
+            director_emit(sys='DEBUG', sig='SNAPSHOT', val=dict(action=action, key=key, warm=True))
+            return
+        if opensim_proc is not None and opensim_proc.poll() is None:
+            raise DirectorError("snapshot restore must run before OpenSim is started")
+        names = sorted(name for name in os.listdir(cache_dir) if name.endswith(".db"))
+        for name in names:
+            target = os.path.join(OBSERVATORY_DIR, name)
+            for stale in (target, target + "-journal", target + "-wal", target + "-shm"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            clone_file(os.path.join(cache_dir, name), target)
+        ms = int((time.time() - start_time) * 1000)
+        print(f"[DIRECTOR] Restored {len(names)} databases from snapshot {key} in {ms}ms.")
+        director_emit(sys='DEBUG', sig='SNAPSHOT', val=dict(action=action, key=key, hit=True, dbs=names, ms=ms))
+
+    elif action == "save":
+        if os.path.isdir(cache_dir):
+            print(f"[DIRECTOR] Snapshot {key} already cached.")
+            return
+        names = sorted(os.path.basename(path) for path in glob.glob(os.path.join(OBSERVATORY_DIR, "*.db")))
+        if not names:
+            print(f"[DIRECTOR] Warning: no databases in {OBSERVATORY_DIR}; snapshot {key} not saved.")
+            return
+        staging = f"{cache_dir}.tmp{os.getpid()}"
+        os.makedirs(staging, exist_ok=True)
+        try:
+            for name in names:
+                # The backup API gives a consistent copy even while OpenSim has the DB open
+                src = sqlite3.connect(f"file:{os.path.join(OBSERVATORY_DIR, name)}?mode=ro", uri=True)
+                dst = sqlite3.connect(os.path.join(staging, name))
+                try:
+                    src.backup(dst)
+                finally:
+                    dst.close()
+                    src.close()
+            os.rename(staging, cache_dir)
+        except (sqlite3.Error, OSError) as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            print(f"[DIRECTOR] Warning: could not save snapshot {key}: {e}")
+            return
+        ms = int((time.time() - start_time) * 1000)
+        print(f"[DIRECTOR] Saved {len(names)} databases as snapshot {key} in {ms}ms.")
+        director_emit(sys='DEBUG', sig='SNAPSHOT', val=dict(action=action, key=key, dbs=names, ms=ms))
+
+    else:
+        raise DirectorError(f"Unknown snapshot action: '{action}' (expected restore or save)")
 
 # --- Parser ---
 
@@ -1433,6 +3501,8 @@ def parse_and_execute(filepath):
 
     # Resolve Includes (Pre-processor)
     text = resolve_includes(text, os.path.dirname(os.path.abspath(filepath)))
+    global SCENARIO_TEXT
+    SCENARIO_TEXT = text
 
     director_log_file = os.path.join(VIVARIUM_DIR, f"encounter.{SCENARIO_NAME}.director.log")
     global director_log
@@ -1449,6 +3519,8 @@ def parse_and_execute(filepath):
     except Exception as e:
         print(f"[DIRECTOR] Warning: Could not save teleplay: {e}")
 
+    prepare_warm_territory()
+
     # Parse Code Blocks
     pattern = re.compile(r'^```([\w-]+)(?:[ \t]+(.*?))?\n(.*?)```', re.MULTILINE | re.DOTALL)
 
@@ -1469,11 +3541,11 @@ def parse_and_execute(filepath):
         elif block_type == 'bash':
             run_bash(block_content)
         elif block_type == 'cast':
-            run_cast(block_content)
+            run_cast(block_content, bulk='bulk' in block_args.lower().split())
         elif block_type == 'legacy-cast' or block_type == 'cast-legacy':
             run_legacy_cast(block_content)
         elif block_type == 'opensim' or block_type == 'territory':
-            run_opensim(block_content)
+            run_opensim(block_content, batch='batch' in block_args.lower().split())
         elif block_type == 'mimic':
             name = block_args if block_args else "Visitant"
             run_mimic_block(name, block_content, strict=False)
@@ -1484,8 +3556,16 @@ def parse_and_execute(filepath):
             run_verify(block_content)
         elif block_type == 'await':
             run_await(block_content)
+        elif block_type == 'await-all':
+            run_await_group(block_content, 'all')
+        elif block_type == 'await-any':
+            run_await_group(block_content, 'any')
         elif block_type == 'async-sensor':
             run_async_sensor(block_content)
+        elif block_type == 'seed-prims':
+            run_seed_prims(block_content)
+        elif block_type == 'snapshot':
+            run_snapshot(block_args.lower() or block_content.strip().lower())
         elif block_type == 'wait':
             try:
                 ms = int(block_content.strip())
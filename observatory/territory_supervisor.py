@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Territory Supervisor: keeps one booted simulant (OpenSim) running between
+Director invocations (warm territory mode, see DIRECTOR.md).
+
+The Director launches it detached, with the simulant's command line after
+`--` and the simulant's environment and working directory. It records the
+simulant in a state file, which the next Director run reads to attach.
+Directors lease the simulant through the lock file; the supervisor stops it
+on SIGTERM, when it exits on its own, or once no Director has held the lease
+for --idle seconds.
+"""
+import argparse
+import fcntl
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+POLL_INTERVAL = 1.0 # seconds between idle checks
+
+def write_state(path, state):
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=4)
+    os.replace(tmp, path)
+
+def lease_idle(lock_path, idle):
+    """True if no Director holds the lease and none has touched it for `idle` seconds."""
+    try:
+        last_used = os.stat(lock_path).st_mtime
+    except FileNotFoundError:
+        last_used = 0
+    if time.time() - last_used < idle:
+        return False
+    with open(lock_path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        fcntl.flock(f, fcntl.LOCK_UN)
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Keeps a warm territory (simulant) running between Director runs.")
+    parser.add_argument("--state", required=True, help="State file read by the Director")
+    parser.add_argument("--lock", required=True, help="Lease lock file held by the Director using the simulant")
+    parser.add_argument("--key", default="", help="Configuration key the simulant was booted from")
+    parser.add_argument("--idle", type=float, default=1800, help="Seconds without a Director before stopping (0: never)")
+    parser.add_argument("cmd", nargs=argparse.REMAINDER, help="-- simulant command line")
+    args = parser.parse_args()
+
+    cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    if not cmd:
+        parser.error("missing simulant command line")
+
+    stop_requested = []
+    def request_stop(sig, frame):
+        stop_requested.append(sig)
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGHUP, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    state = {
+        "supervisor_pid": os.getpid(),
+        "pid": proc.pid,
+        "key": args.key,
+        "cmd": cmd,
+        "encounter_log": os.environ.get("OPENSIM_ENCOUNTER_LOG"),
+        "started": time.time()
+    }
+    write_state(args.state, state)
+    print(f"[SUPERVISOR] Simulant started (PID {proc.pid}): {' '.join(cmd)}", flush=True)
+
+    stopping = False
+    while True:
+        try:
+            code = proc.wait(timeout=POLL_INTERVAL)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+        if stopping:
+            continue
+        reason = None
+        if stop_requested:
+            reason = f"signal {stop_requested[0]}"
+        elif args.idle > 0 and lease_idle(args.lock, args.idle):
+            reason = f"idle for {args.idle:g}s"
+        if reason:
+            print(f"[SUPERVISOR] Stopping simulant ({reason})...", flush=True)
+            stopping = True
+            proc.terminate()
+            try:
+                code = proc.wait(timeout=10)
+                break
+            except subprocess.TimeoutExpired:
+                print("[SUPERVISOR] Killing simulant...", flush=True)
+                proc.kill()
+
+    state["returncode"] = code
+    state["stopped"] = time.time()
+    write_state(args.state, state)
+    print(f"[SUPERVISOR] Simulant exited with code {code}.", flush=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,39 +1,99 @@
 #!/usr/bin/env python3
-import urllib.request
+import http.client
 import urllib.parse
-import urllib.error
 import argparse
+import select
 import sys
 import time
 import xml.etree.ElementTree as ET
 import json
 import threading
 
+# OpenSim answers ReadResponses as a long poll: it holds the request until
+# there is output or its own poll timeout (25s) expires.
+POLL_REQUEST_TIMEOUT = 30.0
+
 class ConsoleSession:
-    def __init__(self, base_url, user, password):
+    def __init__(self, base_url, user, password, request_timeout=0.25, poll_timeout=POLL_REQUEST_TIMEOUT):
         self.base_url = base_url
         self.user = user
         self.password = password
         self.session_id = None
-        self.last_line_seen = 0 # Not strictly used by us, but concept is there
+        self.last_line_seen = 0 # Highest console line Number processed so far
 
-    def _make_request(self, url, params=None):
-        try:
-            if params:
-                data = urllib.parse.urlencode(params).encode('utf-8')
-                req = urllib.request.Request(url, data=data)
-            else:
-                req = urllib.request.Request(url)
-
-            with urllib.request.urlopen(req, timeout=0.25) as response:
-                return response.read().decode('utf-8')
-        except Exception as e:
-            # sys.stderr.write(f"Request Error: {e}\n")
-            return None
+        # One persistent keep-alive HTTP connection, reopened transparently
+        parts = urllib.parse.urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.request_timeout = request_timeout # session and command posts
+        self.poll_timeout = poll_timeout # ReadResponses long polls
+        self.conn = None
+        # ReadResponses long polls run on their own connection, so a poll left
+        # waiting past a caller's deadline never holds up command posts
+        self.poll_conn = None
+        self.poll_pending = False # a ReadResponses request is awaiting its response
+
+    def _new_connection(self, timeout):
+        factory = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return factory(self.host, self.port, timeout=timeout)
+
+    def _connection(self):
+        if self.conn is None:
+            self.conn = self._new_connection(self.request_timeout)
+        return self.conn
+
+    def _close_poll(self):
+        if self.poll_conn is not None:
+            self.poll_conn.close()
+            self.poll_conn = None
+        self.poll_pending = False
+
+    def _close_request(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def close(self):
+        self._close_request()
+        self._close_poll()
+
+    def _make_request(self, path, params=None):
+        """Returns the response body, or None on failure."""
+        path = self.prefix + path
+        if params:
+            body = urllib.parse.urlencode(params)
+            method, headers = "POST", {"Content-Type": "application/x-www-form-urlencoded"}
+        else:
+            body = None
+            method, headers = "GET", {}
+
+        # A kept-alive socket may have been closed by the server since the
+        # last request; in that case reconnect and retry once.
+        for attempt in (1, 2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read().decode('utf-8')
+                if response.will_close:
+                    self._close_request()
+                return data if response.status < 400 else None
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                    BrokenPipeError, ConnectionResetError, ConnectionAbortedError) as e:
+                self._close_request()
+                if attempt == 2:
+                    return None
+            except Exception as e:
+                # Timeouts, refused connections, etc.: drop the connection (a
+                # late response would desynchronize it) and report no response.
+                # sys.stderr.write(f"Request Error: {e}\n")
+                self._close_request()
+                return None
 
     def connect(self):
-        url = f"{self.base_url}/StartSession/"
-        response = self._make_request(url, {'USER': self.user, 'PASS': self.password})
+        response = self._make_request("/StartSession/", {'USER': self.user, 'PASS': self.password})
         if not response:
             return False
 
@@ -42,6 +102,8 @@ class ConsoleSession:
             sid = root.find('SessionID')
             if sid is not None and sid.text:
                 self.session_id = sid.text.strip()
+                self.last_line_seen = 0
+                self._close_poll() # a poll still pending belongs to the old session
                 return True
         except:
             pass
@@ -49,31 +111,238 @@ class ConsoleSession:
 
     def send(self, command):
         if not self.session_id: return False
-        url = f"{self.base_url}/SessionCommand/"
-        response = self._make_request(url, {'ID': self.session_id, 'COMMAND': command})
+        response = self._make_request("/SessionCommand/", {'ID': self.session_id, 'COMMAND': command})
         return response and "Result>OK" in response
 
-    def poll(self):
-        if not self.session_id: return None
-        url = f"{self.base_url}/ReadResponses/{self.session_id}"
-        return self._make_request(url)
+    def _read_responses(self, sink, wait):
+        """Issues the ReadResponses long poll (or resumes the one still pending)
+        and streams its body into sink(chunk). Returns False if no response
+        started within `wait` seconds: the request then stays pending and the
+        next call reads its response, so output the server has already
+        handed out is never dropped."""
+        path = f"{self.prefix}/ReadResponses/{self.session_id}"
+        # A kept-alive socket may have been closed by the server since the
+        # last poll; in that case reconnect and retry once.
+        for attempt in (1, 2):
+            if not self.poll_pending:
+                if self.poll_conn is None:
+                    self.poll_conn = self._new_connection(self.poll_timeout)
+                try:
+                    self.poll_conn.request("GET", path)
+                except Exception:
+                    self._close_poll()
+                    if attempt == 2:
+                        return False
+                    continue
+                self.poll_pending = True
+
+            conn = self.poll_conn
+            try:
+                ready, _, _ = select.select([conn.sock], [], [], max(0.0, wait))
+            except (OSError, ValueError):
+                self._close_poll()
+                return False
+            if not ready:
+                return False
 
-def parse_lines(xml_content):
+            self.poll_pending = False
+            streamed = False
+            try:
+                conn.sock.settimeout(self.poll_timeout)
+                response = conn.getresponse()
+                if response.status >= 400:
+                    response.read()
+                else:
+                    while chunk := response.read(STREAM_CHUNK_SIZE):
+                        streamed = True
+                        sink(chunk)
+                if response.will_close:
+                    self._close_poll()
+                return response.status < 400
+            except (http.client.RemoteDisconnected, BrokenPipeError,
+                    ConnectionResetError, ConnectionAbortedError):
+                self._close_poll()
+                # A half-consumed stream cannot be replayed into the sink
+                if attempt == 2 or streamed:
+                    return False
+            except Exception:
+                # Timeouts mid-body, etc.: the connection cannot be reused
+                self._close_poll()
+                return False
+        return False
+
+    def poll_lines(self, timeout=None):
+        """Reads pending console output, parsing the response as it streams
+        in, and returns only the lines numbered after last_line_seen. Waits at
+        most `timeout` seconds (capped at poll_timeout) for the server to
+        answer. If the response breaks off mid-stream, the lines parsed up to
+        that point are still returned (the server has already moved past them)."""
+        if not self.session_id: return []
+        wait = self.poll_timeout if timeout is None else min(self.poll_timeout, timeout)
+        reader = LineReader(self.last_line_seen)
+        self._read_responses(reader.feed, wait)
+        self.last_line_seen = reader.last_line
+        return reader.lines
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+class LineReader:
+    """Incremental parser for ReadResponses bodies. Each <Line> is turned
+    into a dict as soon as its end tag is fed, and dropped from the tree
+    right away; lines whose Number is not above `after` (already seen)
+    are skipped."""
+
+    def __init__(self, after=0):
+        self.parser = ET.XMLPullParser(events=('start', 'end'))
+        self.root = None
+        self.last_line = after
+        self.lines = []
+        self.failed = False
+
+    def feed(self, data):
+        if self.failed: return
+        try:
+            self.parser.feed(data)
+            for event, elem in self.parser.read_events():
+                if event == 'start':
+                    if self.root is None:
+                        self.root = elem
+                    continue
+                if elem.tag != 'Line':
+                    continue
+                number = elem.get('Number')
+                number = int(number) if number and number.isdigit() else None
+                if number is None or number > self.last_line:
+                    self.lines.append({
+                        'text': elem.text or "",
+                        'input': elem.get('Input') == 'true',
+                        'prompt': elem.get('Prompt') == 'true',
+                        'command': elem.get('Command') == 'true'
+                    })
+                    if number is not None:
+                        self.last_line = number
+            # Parsed lines are no longer needed in the tree
+            if self.root is not None:
+                del self.root[:]
+        except ET.ParseError:
+            self.failed = True
+
+def parse_lines(xml_content, after=0):
     if not xml_content: return []
-    try:
-        root = ET.fromstring(xml_content)
-        parsed = []
-        for line in root.findall('Line'):
-            entry = {
-                'text': line.text or "",
-                'input': line.get('Input') == 'true',
-                'prompt': line.get('Prompt') == 'true',
-                'command': line.get('Command') == 'true'
-            }
-            parsed.append(entry)
-        return parsed
-    except:
-        return []
+    reader = LineReader(after)
+    reader.feed(xml_content)
+    return reader.lines
+
+# Response polling backs off exponentially while the console is quiet
+POLL_MIN_INTERVAL = 0.005
+POLL_MAX_INTERVAL = 0.2
+DEFAULT_COMMAND_TIMEOUT = 10.0
+
+# How many of the oldest unanswered commands an echo line is matched against
+ECHO_WINDOW = 16
+
+def is_echo(line, command):
+    # Note: OpenSim echoes inputs.
+    # Strict matching: l['input'] and l['text'].strip() == command
+    # Relaxed matching: just l['input']? No, might see previous inputs if race?
+    return line['input'] and (line['text'].strip() == command or command in line['text'])
+
+def match_echo(line, pending):
+    """Index of the pending command `line` echoes (exact text first, then a
+    relaxed match), looking only at the oldest ECHO_WINDOW; None if none."""
+    if not line['input']:
+        return None
+    window = pending[:ECHO_WINDOW]
+    for i, result in enumerate(window):
+        if line['text'].strip() == result["command"]:
+            return i
+    for i, result in enumerate(window):
+        if is_echo(line, result["command"]):
+            return i
+    return None
+
+def execute_batch(session, commands, timeout=DEFAULT_COMMAND_TIMEOUT):
+    """Send several commands back to back, then collect all of their output
+    in one polling loop. Returns one result per command, in order."""
+    results = []
+    pending = [] # results still awaiting their echo, in send order
+    for command in commands:
+        if session.send(command):
+            result = {"command": command, "output": [], "seen_echo": False, "complete": False}
+            pending.append(result)
+        else:
+            result = {"error": "Send failed", "command": command}
+        results.append(result)
+
+    # OpenSim runs console commands one at a time, so each command's echo
+    # (Input=true) is followed by its output and then a prompt (Prompt=true)
+    # before the next command's echo. Echoes are matched by command text, so
+    # one missing echo does not hold up the commands after it; commands sent
+    # before the matched one whose echo never came are given up on.
+    current = None
+    deadline = time.time() + timeout
+    interval = POLL_MIN_INTERVAL
+
+    # Poll immediately; fast commands have usually answered by now. Each
+    # long poll waits no longer than the time left, so `timeout` bounds the call.
+    while pending or current:
+        lines = session.poll_lines(timeout=max(0.0, deadline - time.time()))
+
+        for l in lines:
+            # sys.stderr.write(f"DEBUG LINE: {l}\n")
+            index = match_echo(l, pending)
+            if index is not None:
+                for missed in pending[:index]:
+                    missed["missed_echo"] = True
+                del pending[:index]
+                current = pending.pop(0)
+                current["seen_echo"] = True
+                continue # Don't include the echo in output
+
+            if current:
+                if l['prompt']:
+                    current["complete"] = True
+                    current = None
+                elif not l['input'] and not l['command']: # Normal output
+                    current["output"].append(l['text'])
+
+        remaining = deadline - time.time()
+        if not (pending or current) or remaining <= 0:
+            break
+
+        # Console is producing output: check back right away; quiet: back off
+        interval = POLL_MIN_INTERVAL if lines else min(interval * 2, POLL_MAX_INTERVAL)
+        time.sleep(min(interval, remaining))
+
+    for i, result in enumerate(results):
+        if "error" in result: continue
+        results[i] = {
+            "command": result["command"],
+            "response": "\n".join(result["output"]).split('#---')[-1].removeprefix('# \n'),
+            "status": "OK" if result["complete"] else "NO_ECHO" if result.get("missed_echo") else "TIMEOUT",
+            "complete": result["complete"]
+        }
+    return results
+
+def execute(session, command, timeout=DEFAULT_COMMAND_TIMEOUT):
+    """Send one command and collect its output until the next prompt."""
+    return execute_batch(session, [command], timeout)[0]
+
+def parse_request(line, default_timeout):
+    """A request is either a plain command line or a JSON object
+    {"command": ..., "timeout": seconds} / {"batch": [...], "timeout": seconds}.
+    Returns (command or list of commands, timeout)."""
+    if line.startswith('{'):
+        try:
+            request = json.loads(line)
+            timeout = request.get("timeout")
+            timeout = float(timeout if timeout is not None else default_timeout)
+            if "batch" in request:
+                return [str(c).strip() for c in request["batch"] if str(c).strip()], timeout
+            return str(request.get("command", "")).strip(), timeout
+        except (ValueError, TypeError, AttributeError):
+            pass
+    return line, default_timeout
 
 def main():
     parser = argparse.ArgumentParser()
@@ -81,10 +350,10 @@ def main():
     parser.add_argument("--user", required=True)
     parser.add_argument("--password", required=True)
     parser.add_argument("--timeout", type=float, default=15.0)
+    parser.add_argument("--command-timeout", type=float, default=DEFAULT_COMMAND_TIMEOUT)
     args = parser.parse_args()
 
     session = ConsoleSession(args.url, args.user, args.password)
-    import time
     st = time.time()
     connected = False
     while (time.time()-st) < args.timeout and not connected:
@@ -100,59 +369,13 @@ def main():
 
     # REPL Loop
     for line in sys.stdin:
-        command = line.strip()
-        if not command: continue
-
-        # 1. Send Command
-        if not session.send(command):
-            print(json.dumps({"error": "Send failed", "command": command}), flush=True)
+        command, timeout = parse_request(line.strip(), args.command_timeout)
+        if isinstance(command, list):
+            print(json.dumps({"batch": execute_batch(session, command, timeout)}), flush=True)
             continue
+        if not command: continue
 
-        # 2. Poll for Output
-        # We need to find the ECHO of our command (Input=true, text=command)
-        # Then capture until Prompt=true
-
-        captured_output = []
-        seen_echo = False
-        start_time = time.time()
-        timeout = 10.0 # seconds
-
-        while time.time() - start_time < timeout:
-            xml_resp = session.poll()
-            lines = parse_lines(xml_resp)
-
-            complete = False
-            for l in lines:
-                # sys.stderr.write(f"DEBUG LINE: {l}\n")
-
-                # Check for Echo
-                if not seen_echo:
-                    # Note: OpenSim echoes inputs.
-                    # Strict matching: l['input'] and l['text'].strip() == command
-                    # Relaxed matching: just l['input']? No, might see previous inputs if race?
-                    if l['input'] and (l['text'].strip() == command or command in l['text']):
-                        seen_echo = True
-                        continue # Don't include the echo in output
-
-                if seen_echo:
-                    if l['prompt']:
-                        complete = True
-                        break # Done
-                    if not l['input'] and not l['command']: # Normal output
-                        captured_output.append(l['text'])
-
-            if complete:
-                break
-
-            time.sleep(0.2)
-
-        # 3. Emit Result
-        result = {
-            "command": command,
-            "response": "\n".join(captured_output).split('#---')[-1].removeprefix('# \n'),
-            "status": "OK" if seen_echo else "TIMEOUT"
-        }
-        print(json.dumps(result), flush=True)
+        print(json.dumps(execute(session, command, timeout)), flush=True)
 
 if __name__ == "__main__":
     main()